@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Measure asyncio batch extraction throughput against concurrency under
+simulated storage latency: every file open in the reader and writer sleeps
+for the given time first, as a network share would.
+
+Usage:
+  python benchmarks/bench_async.py [files] [string_count] [latency_ms] [concurrency,...]
+"""
+
+import os
+import sys
+import time
+import builtins
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import modules.datfile
+import modules.extract
+from modules.aio import run_async, run_batch_async
+from synthetic import write_language_pack
+
+
+def simulate_latency(seconds):
+    """
+    Make the .dat reader and .txt writer wait `seconds` on every open.
+    """
+    def slow_open(*args, **kwargs):
+        time.sleep(seconds)
+        return builtins.open(*args, **kwargs)
+
+    modules.datfile.open = slow_open
+    modules.extract.open = slow_open
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    latency = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.05
+    levels = [int(x) for x in sys.argv[4].split(',')] if len(sys.argv) > 4 else [1, 2, 4, 8, 16]
+    with tempfile.TemporaryDirectory() as tmp:
+        pack_dir = os.path.join(tmp, 'pack')
+        write_language_pack(pack_dir, count, languages=files)
+        simulate_latency(latency)
+        print(f"Files: {files}, strings per file: {count}, latency per open: {latency * 1000:.0f} ms")
+        baseline = None
+        for concurrency in levels:
+            txt_dir = os.path.join(tmp, f'txt{concurrency}')
+            start = time.perf_counter()
+            batch = run_async(run_batch_async('extract', pack_dir, txt_dir, concurrency=concurrency))
+            elapsed = time.perf_counter() - start
+            if not batch:
+                raise RuntimeError(f"Batch failed: {batch.error or batch.failed}")
+            baseline = baseline or elapsed
+            print(f"- concurrency {concurrency:>3}: {elapsed * 1000:8.1f} ms, {files / elapsed:7.1f} files/s, "
+                  f"speed-up {baseline / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
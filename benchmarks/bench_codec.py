@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compare per-string UTF-16 decoding/encoding of a string table with the bulk
+codec (one decode/encode call per table), with and without NumPy for the
+offset arithmetic, and check that all paths agree byte for byte.
+
+Usage:
+  python benchmarks/bench_codec.py [string_count] [repeats] [non_bmp_ratio]
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import modules.utf16
+from modules.datfile import StringTable
+from synthetic import make_strings, best_of
+
+
+def per_string_decode(table):
+    return [table.payload(i).decode('utf-16le', 'replace') for i in range(len(table))]
+
+
+def per_string_encode(strings):
+    return StringTable.from_payloads([text.encode('utf-16le') for text in strings]).to_bytes()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    non_bmp_ratio = float(sys.argv[3]) if len(sys.argv) > 3 else 0.05
+    strings = make_strings(count, non_bmp_ratio=non_bmp_ratio)
+    table = StringTable.from_strings(strings)
+    expected = per_string_encode(strings)
+    print(f"Strings: {count}, non-BMP ratio: {non_bmp_ratio}, text section: {len(table.text)} bytes, best of {repeats}")
+    decode_time = best_of(lambda: per_string_decode(table), repeats)
+    encode_time = best_of(lambda: per_string_encode(strings), repeats)
+    print(f"- per-string decode:        {decode_time * 1000:8.2f} ms")
+    print(f"- per-string encode:        {encode_time * 1000:8.2f} ms")
+    for label, use_numpy in (('pure Python', False), ('NumPy', True)):
+        modules.utf16.USE_NUMPY = use_numpy
+        if use_numpy and modules.utf16._numpy() is None:
+            print("- NumPy not installed, skipped")
+            continue
+        identical = table.decode_all() == strings and StringTable.from_strings(strings).to_bytes() == expected
+        bulk_decode = best_of(table.decode_all, repeats)
+        bulk_encode = best_of(lambda: StringTable.from_strings(strings).to_bytes(), repeats)
+        print(f"- bulk decode ({label}): {bulk_decode * 1000:8.2f} ms ({decode_time / bulk_decode:.1f}x)")
+        print(f"- bulk encode ({label}): {bulk_encode * 1000:8.2f} ms ({encode_time / bulk_encode:.1f}x)")
+        print(f"- Identical to per-string ({label}): {identical}")
+    modules.utf16.USE_NUMPY = None
+
+
+if __name__ == "__main__":
+    main()
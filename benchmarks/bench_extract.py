@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compare the per-line extraction writer with the block-rendering extractor.
+
+Usage:
+  python benchmarks/bench_extract.py [string_count] [repeats]
+"""
+
+import os
+import struct
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import make_strings, best_of
+from modules.datfile import write_dat_file_buffered
+from modules.extract import extract_strings
+from modules.utils import read_bed_file
+
+
+def legacy_read(dat_path):
+    """
+    The seek-and-read .dat reader used before DatFile.
+    """
+    with open(dat_path, 'rb') as f:
+        str_num = struct.unpack('<I', f.read(4))[0] & 0xFFFF
+        strings = []
+        for _ in range(str_num):
+            str_pos = struct.unpack('<I', f.read(4))[0]
+            str_len = struct.unpack('<I', f.read(4))[0]
+            last_pos = f.tell()
+            f.seek(str_pos)
+            strings.append(f.read(str_len * 2).decode('utf-16le', errors='replace'))
+            f.seek(last_pos)
+        return str_num, strings
+
+
+def legacy_extract(dat_path, bed_path, output_path, original_dat_path):
+    """
+    The extractor as it was before DatFile and block rendering: eager
+    seek-and-read decoding, several small out.write calls per line and a
+    separate path for original text.
+    """
+    string_ids, _ = read_bed_file(bed_path)
+    _, strings = legacy_read(dat_path)
+    _, original_strings = legacy_read(original_dat_path)
+    with open(output_path, 'w', encoding='utf-8') as out:
+        for string_id, text in enumerate(strings):
+            string_name = string_ids.get(string_id, f"String_{string_id}")
+            if '\n' in text:
+                out.write(f"[String ID: {string_id}] [{string_name}] [Do not remove {{LF}} tags]\n")
+            else:
+                out.write(f"[String ID: {string_id}] [{string_name}]\n")
+            if original_strings and string_id < len(original_strings):
+                orig_text = original_strings[string_id]
+                if orig_text == '':
+                    out.write('//{EMPTY}//\n')
+                elif orig_text == '{INVALID}':
+                    out.write('//{INVALID}//\n')
+                else:
+                    orig_lines = orig_text.split('\n')
+                    out.write('//')
+                    for i, line in enumerate(orig_lines):
+                        out.write(line)
+                        if i < len(orig_lines) - 1:
+                            out.write('{LF}\n')
+                    out.write('//\n')
+            if text:
+                lines = text.split('\n')
+                for i, line in enumerate(lines):
+                    out.write(line)
+                    if i < len(lines) - 1:
+                        out.write('{LF}\n')
+                    elif i == len(lines) - 1 and line:
+                        out.write('\n')
+            else:
+                out.write('{EMPTY}\n')
+            out.write('\n')
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    with tempfile.TemporaryDirectory() as tmp:
+        dat_path = os.path.join(tmp, 'language1.dat')
+        original_path = os.path.join(tmp, 'language0.dat')
+        bed_path = os.path.join(tmp, 'languages.bed')
+        write_dat_file_buffered(dat_path, make_strings(count, seed=1))
+        write_dat_file_buffered(original_path, make_strings(count, seed=0))
+        with open(bed_path, 'w', encoding='utf-8') as f:
+            f.writelines(f"STRING_{i} = {i}\n" for i in range(count))
+        legacy_path = os.path.join(tmp, 'legacy.txt')
+        new_path = os.path.join(tmp, 'new.txt')
+        legacy_time = best_of(lambda: legacy_extract(dat_path, bed_path, legacy_path, original_path), repeats)
+        new_time = best_of(lambda: extract_strings(dat_path, bed_path, new_path, original_dat_path=original_path), repeats)
+        with open(legacy_path, 'rb') as a, open(new_path, 'rb') as b:
+            identical = a.read() == b.read()
+    print(f"Strings: {count} (with --original-d), best of {repeats}")
+    print(f"- Legacy extractor: {legacy_time * 1000:8.2f} ms")
+    print(f"- Block extractor:  {new_time * 1000:8.2f} ms")
+    print(f"- Speed-up: {legacy_time / new_time:.1f}x")
+    print(f"- Identical output: {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Measure CLI startup: run langtool_x.py under `python -X importtime` for the
+common commands on a small synthetic pack and report wall time, cumulative
+import time and the number of imported modules.
+
+Results are compared with benchmarks/startup_baseline.json, which lists the
+project and heavy third-party modules each command imported when the baseline
+was recorded. A command that now imports more of them, or whose import time
+grew by more than the tolerance, is a regression and the script exits with
+status 1. Timings vary between machines, so only the module lists are
+compared unless --tolerance is given.
+
+Usage:
+  python benchmarks/bench_startup.py [--repeats N] [--tolerance PERCENT] [--update]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import write_language_pack
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, 'langtool_x.py')
+BASELINE_PATH = os.path.join(ROOT, 'benchmarks', 'startup_baseline.json')
+TRACKED_THIRD_PARTY = ('numpy',)
+
+
+def commands(pack, tmp):
+    """
+    Return (name, argv) for every measured command.
+    """
+    dat, bed, txt = pack['dat'][1], pack['bed'], pack['txt'][1]
+    return [
+        ('help', ['--help']),
+        ('get', ['--get', '3', '--dat', dat, '--bed', bed]),
+        ('diff', ['--diff', pack['dat'][0], dat]),
+        ('extract', ['--extract', '--dat', dat, '--bed', bed, '--txt', os.path.join(tmp, 'out.txt')]),
+        ('convert', ['--convert', '--dat', dat, '--bed', bed, '--txt', txt, '--out', os.path.join(tmp, 'out.dat')]),
+    ]
+
+
+def parse_importtime(stderr):
+    """
+    Return ({module: cumulative microseconds}, total import microseconds)
+    from `-X importtime` output. The total sums the top-level imports.
+    """
+    modules = {}
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = len(name) - len(name.lstrip())
+        modules[name.strip()] = int(cumulative)
+        if depth == 1:
+            total += int(cumulative)
+    return modules, total
+
+
+def tracked(modules):
+    """
+    Modules whose import a regression check should notice: the project's
+    own and the heavy optional dependencies.
+    """
+    return sorted(name for name in modules
+                  if name.startswith('modules.') or name.split('.')[0] in TRACKED_THIRD_PARTY and '.' not in name)
+
+
+def measure(argv, cwd, repeats):
+    """
+    Run the CLI `repeats` times; return the fastest run as a dict.
+    """
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, '-X', 'importtime', SCRIPT] + argv, cwd=cwd,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        wall = time.perf_counter() - start
+        if proc.returncode != 0:
+            raise RuntimeError(f"{' '.join(argv)} exited with {proc.returncode}")
+        modules, import_us = parse_importtime(proc.stderr)
+        if best is None or wall < best['wall_ms'] / 1000:
+            best = {'wall_ms': round(wall * 1000, 1), 'import_ms': round(import_us / 1000, 1),
+                    'module_count': len(modules), 'modules': tracked(modules)}
+    return best
+
+
+def compare(name, current, baseline, tolerance):
+    """
+    Return regression messages for one command.
+    """
+    problems = []
+    extra = sorted(set(current['modules']) - set(baseline['modules']))
+    if extra:
+        problems.append(f"{name}: now imports {', '.join(extra)}")
+    if tolerance is not None and current['import_ms'] > baseline['import_ms'] * (1 + tolerance / 100):
+        problems.append(f"{name}: import time {current['import_ms']} ms > baseline {baseline['import_ms']} ms "
+                        f"+ {tolerance:g}%")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure LangTool X CLI startup")
+    parser.add_argument('--repeats', type=int, default=5, help="runs per command, fastest is kept (default: 5)")
+    parser.add_argument('--tolerance', type=float, help="also fail if import time grew by more than PERCENT")
+    parser.add_argument('--update', action='store_true', help=f"rewrite {os.path.relpath(BASELINE_PATH, ROOT)}")
+    args = parser.parse_args()
+    baseline = {}
+    if os.path.exists(BASELINE_PATH) and not args.update:
+        with open(BASELINE_PATH, encoding='utf-8') as f:
+            baseline = json.load(f)['commands']
+    results = {}
+    problems = []
+    with tempfile.TemporaryDirectory() as tmp:
+        pack = write_language_pack(os.path.join(tmp, 'pack'), 2000)
+        print(f"Python {sys.version.split()[0]}, best of {args.repeats}")
+        for name, argv in commands(pack, tmp):
+            current = results[name] = measure(argv, tmp, args.repeats)
+            print(f"- {name:<8} wall {current['wall_ms']:7.1f} ms, imports {current['import_ms']:7.1f} ms, "
+                  f"{current['module_count']:4d} modules, project modules: {len(current['modules'])}")
+            if name in baseline:
+                problems += compare(name, current, baseline[name], args.tolerance)
+    if args.update:
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'commands': results}, f, indent=2)
+            f.write('\n')
+        print(f"Baseline written to {BASELINE_PATH}")
+        return 0
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Measure --verify throughput on a directory of .dat files against worker
+count, next to the serial validate_dat_structure loop it replaces.
+
+Usage:
+  python benchmarks/bench_verify.py [files] [string_count] [workers,...]
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.batch import find_dat_files
+from modules.datfile import validate_dat_structure
+from modules.verify import verify_dat_files
+from synthetic import write_language_pack
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    levels = [int(x) for x in sys.argv[3].split(',')] if len(sys.argv) > 3 else [1, 2, 4, os.cpu_count() or 1]
+    with tempfile.TemporaryDirectory() as tmp:
+        write_language_pack(tmp, count, languages=files)
+        dat_paths = find_dat_files(tmp)
+        size = sum(os.path.getsize(path) for path in dat_paths) / 1e6
+        print(f"Files: {files}, strings per file: {count}, total {size:.1f} MB, {os.cpu_count()} CPUs")
+        start = time.perf_counter()
+        for path in dat_paths:
+            validate_dat_structure(path)
+        serial = time.perf_counter() - start
+        print(f"- serial validate_dat_structure (no checksums): {serial * 1000:8.1f} ms, {size / serial:6.1f} MB/s")
+        baseline = None
+        for workers in sorted(set(levels)):
+            start = time.perf_counter()
+            batch = verify_dat_files(tmp, workers=workers)
+            elapsed = time.perf_counter() - start
+            if not batch:
+                raise RuntimeError(f"Verify failed: {batch.error or batch.failed}")
+            baseline = baseline or elapsed
+            print(f"- verify, {workers:>3} workers: {elapsed * 1000:8.1f} ms, {size / elapsed:6.1f} MB/s, "
+                  f"speed-up {baseline / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compare the per-entry .dat writer with the single-buffer writer.
+
+Usage:
+  python benchmarks/bench_writer.py [string_count] [repeats]
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.datfile import write_dat_file_table, write_dat_file_buffered
+from synthetic import make_strings, best_of
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    strings = make_strings(count)
+    with tempfile.TemporaryDirectory() as tmp:
+        table_path = os.path.join(tmp, 'table.dat')
+        buffered_path = os.path.join(tmp, 'buffered.dat')
+        table_time = best_of(lambda: write_dat_file_table(table_path, strings), repeats)
+        buffered_time = best_of(lambda: write_dat_file_buffered(buffered_path, strings), repeats)
+        with open(table_path, 'rb') as a, open(buffered_path, 'rb') as b:
+            identical = a.read() == b.read()
+        size = os.path.getsize(buffered_path)
+    print(f"Strings: {count}, output size: {size} bytes, best of {repeats}")
+    print(f"- write_dat_file_table:    {table_time * 1000:8.2f} ms")
+    print(f"- write_dat_file_buffered: {buffered_time * 1000:8.2f} ms")
+    print(f"- Speed-up: {table_time / buffered_time:.1f}x")
+    print(f"- Byte-identical output: {identical}")
+
+
+if __name__ == "__main__":
+    main()
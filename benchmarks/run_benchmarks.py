@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite for LangTool X.
+
+Generates synthetic language packs of increasing size and times each stage
+(read, write, validate, extract, convert), reporting throughput and peak
+Python memory. Results can be written as JSON to compare releases.
+
+Usage:
+  python benchmarks/run_benchmarks.py
+  python benchmarks/run_benchmarks.py --strings 1000,10000,50000 --non-bmp-ratio 0.05 --json results.json
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.datfile import (read_dat_file_table, read_string_table, write_dat_file_table, write_dat_file_buffered,
+                             validate_dat_structure)
+from modules.extract import extract_strings
+from modules.convert import convert_to_dat
+from modules.utils import parse_cache
+from synthetic import write_language_pack, best_of
+
+
+def scenarios(pack, tmp):
+    """
+    Return (name, function, input size in bytes) for every timed stage.
+    """
+    dat, original, txt, bed = pack['dat'][1], pack['dat'][0], pack['txt'][1], pack['bed']
+    _, strings = read_dat_file_table(dat)
+    out_dat = os.path.join(tmp, 'out.dat')
+    out_txt = os.path.join(tmp, 'out.txt')
+    dat_size = os.path.getsize(dat)
+    txt_size = os.path.getsize(txt)
+    return [
+        ('read_dat_file_table', lambda: read_dat_file_table(dat), dat_size),
+        ('read_string_table', lambda: read_string_table(dat), dat_size),
+        ('write_dat_file_table', lambda: write_dat_file_table(out_dat, strings), dat_size),
+        ('write_dat_file_buffered', lambda: write_dat_file_buffered(out_dat, strings), dat_size),
+        ('validate_dat_structure', lambda: validate_dat_structure(dat), dat_size),
+        ('extract_strings', lambda: extract_strings(dat, bed, out_txt), dat_size),
+        ('extract_strings_original', lambda: extract_strings(dat, bed, out_txt, original_dat_path=original), dat_size * 2),
+        ('convert_to_dat', lambda: convert_to_dat(txt, dat, out_dat, bed), txt_size),
+    ]
+
+
+def peak_memory(func):
+    """
+    Peak Python heap allocation of one func() call in bytes (memory maps are not counted).
+    """
+    parse_cache.clear()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(args):
+    """
+    Run every selected scenario for every string count and return result records.
+    """
+    records = []
+    for count in args.strings:
+        with tempfile.TemporaryDirectory() as tmp:
+            pack = write_language_pack(
+                os.path.join(tmp, 'pack'), count, languages=2, seed=args.seed, words=args.words,
+                multiline_ratio=args.multiline_ratio, empty_ratio=args.empty_ratio,
+                non_bmp_ratio=args.non_bmp_ratio)
+            for name, func, size in scenarios(pack, tmp):
+                if args.scenario and not any(s in name for s in args.scenario):
+                    continue
+                func()  # Warm-up: page cache and parse cache
+                seconds = best_of(func, args.repeats)
+                record = {
+                    'scenario': name,
+                    'strings': count,
+                    'input_bytes': size,
+                    'seconds': seconds,
+                    'strings_per_s': count / seconds,
+                    'mb_per_s': size / seconds / 1e6,
+                    'peak_bytes': peak_memory(func) if args.memory else None,
+                }
+                records.append(record)
+                peak = f"{record['peak_bytes'] / 1024:10.0f} KiB" if args.memory else ''
+                print(f"{name:26} {count:>7} strings {seconds * 1000:9.2f} ms "
+                      f"{record['strings_per_s']:12.0f} str/s {record['mb_per_s']:8.1f} MB/s {peak}")
+    return records
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="LangTool X benchmark suite")
+    parser.add_argument('--strings', default='1000,10000,50000',
+                        type=lambda v: [int(x) for x in v.split(',')],
+                        help="Comma-separated string counts (default: 1000,10000,50000)")
+    parser.add_argument('--words', type=int, default=8, help="Maximum words per line")
+    parser.add_argument('--multiline-ratio', type=float, default=0.1)
+    parser.add_argument('--empty-ratio', type=float, default=0.05)
+    parser.add_argument('--non-bmp-ratio', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeats', type=int, default=5, help="Timed runs per scenario; the best is kept")
+    parser.add_argument('--scenario', action='append', help="Only run scenarios containing this text")
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help="Skip peak memory runs")
+    parser.add_argument('--json', help="Write results to this JSON file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    records = run(args)
+    if args.json:
+        report = {
+            'meta': {
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'implementation': platform.python_implementation(),
+                'platform': platform.platform(),
+                'params': {k: v for k, v in vars(args).items() if k != 'json'},
+            },
+            'results': records,
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
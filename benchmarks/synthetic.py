@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic FlatOut-style language packs for benchmarks.
+
+Generates .dat, .txt, .bed and version.ini files with a configurable number of
+strings, string length, share of multiline/empty strings and non-BMP characters.
+Everything is derived from a seed, so runs are reproducible and need no game files.
+"""
+
+import os
+import sys
+import random
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.datfile import write_dat_file_buffered
+from modules.txtblock import format_text_block
+
+WORDS = [
+    'OK', 'Cancel', 'Back', 'Race', 'Track', 'Car', 'Lap', 'Best time', 'Options', 'Career',
+    'Лучшее время', 'Гонка', 'Très bien', 'Schnellste Runde', 'Vuelta', 'レース', '赛车',
+]
+NON_BMP = ['\U0001F3C1', '\U0001F697', '\U0001F3C6', '\U00020BB7']  # Flag, car, trophy, CJK ext. B
+NAME_PARTS = ['MENU', 'RACE', 'CAR', 'TRACK', 'OPTIONS', 'CAREER', 'HUD', 'ONLINE', 'PS2', 'DNAS']
+LANGUAGES = ['ENGLISH', 'FRENCH', 'GERMAN', 'ITALIAN', 'SPANISH', 'RUSSIAN', 'POLISH', 'CZECH', 'JAPANESE', 'CHINESE']
+
+
+def make_strings(count, seed=0, words=8, multiline_ratio=0.1, empty_ratio=0.05, non_bmp_ratio=0.0):
+    """
+    Generate `count` strings of up to `words` words each.
+    multiline_ratio, empty_ratio and non_bmp_ratio are the shares of strings
+    that contain line breaks, are empty, or contain a non-BMP character.
+    """
+    rng = random.Random(seed)
+
+    def line():
+        text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, words)))
+        if rng.random() < non_bmp_ratio:
+            text += ' ' + rng.choice(NON_BMP)
+        return text
+
+    strings = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < empty_ratio:
+            strings.append('')
+        elif roll < empty_ratio + multiline_ratio:
+            strings.append('\n'.join(line() for _ in range(rng.randint(2, 4))))
+        else:
+            strings.append(line())
+    return strings
+
+
+def make_names(count, seed=0):
+    """
+    Generate unique BED-style string names.
+    """
+    rng = random.Random(seed)
+    return [f"{rng.choice(NAME_PARTS)}_{rng.choice(NAME_PARTS)}_{i}" for i in range(count)]
+
+
+def write_language_pack(directory, count, languages=2, seed=0, **string_options):
+    """
+    Write language0.dat .. language{N-1}.dat, matching language{N}.txt files,
+    languages.bed and version.ini into directory.
+    Extra keyword arguments are passed to make_strings.
+    Returns a dict with the written paths.
+    """
+    os.makedirs(directory, exist_ok=True)
+    names = make_names(count, seed)
+    bed_path = os.path.join(directory, 'languages.bed')
+    with open(bed_path, 'w', encoding='utf-8') as f:
+        f.writelines(f"{name} = {i}\n" for i, name in enumerate(names))
+    ini_path = os.path.join(directory, 'version.ini')
+    with open(ini_path, 'w', encoding='utf-8') as f:
+        f.write('-- Generated by benchmarks/synthetic.py\n')
+        f.writelines(f"LANGUAGE_{LANGUAGES[i % len(LANGUAGES)]} = {i}\n" for i in range(languages))
+    dat_paths = []
+    txt_paths = []
+    for lang_id in range(languages):
+        strings = make_strings(count, seed=seed + lang_id, **string_options)
+        dat_path = os.path.join(directory, f'language{lang_id}.dat')
+        if not write_dat_file_buffered(dat_path, strings):
+            raise RuntimeError(f"Could not write {dat_path}")
+        txt_path = os.path.join(directory, f'language{lang_id}.txt')
+        with open(txt_path, 'w', encoding='utf-8') as f:
+            f.writelines(format_text_block(i, names[i], text) for i, text in enumerate(strings))
+        dat_paths.append(dat_path)
+        txt_paths.append(txt_path)
+    return {'bed': bed_path, 'ini': ini_path, 'dat': dat_paths, 'txt': txt_paths}
+
+
+def best_of(func, repeats):
+    """
+    Run func `repeats` times and return the fastest wall time in seconds.
+    """
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
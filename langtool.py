@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+LangTool X library API.
+
+The functions here never print, prompt or configure logging. They return result
+objects with counters, warnings and timings; log records go to the 'langtool'
+logger, which is silent until the caller configures logging.
+
+    import langtool
+    result = langtool.extract('language0.dat', 'languages.bed', 'language0.txt')
+    if not result:
+        raise RuntimeError(result.error)
+"""
+
+from modules.extract import extract_strings as extract
+from modules.convert import convert_to_dat as convert
+from modules.batch import run_batch as batch
+from modules.lookup import lookup_string as lookup
+from modules.diff import diff_dat_files as diff, diff_tables
+from modules.merge import extract_merged
+from modules.verify import verify_dat_file, verify_dat_files
+from modules.aio import extract_async, convert_async, run_batch_async as batch_async
+from modules.datfile import (validate_dat_structure as validate, check_dat_structure, read_string_table,
+                             DatFile, StringTable, DatValidationReport)
+from modules.results import (ExtractResult, ConvertResult, BatchResult, LookupResult, DiffResult, MergeResult,
+                             VerifyResult)
+from modules.utils import parse_cache
+
+__all__ = [
+    'extract', 'extract_merged', 'convert', 'batch', 'lookup', 'diff', 'diff_tables', 'validate',
+    'extract_async', 'convert_async', 'batch_async', 'check_dat_structure', 'read_string_table',
+    'verify_dat_file', 'verify_dat_files',
+    'DatFile', 'StringTable', 'DatValidationReport', 'ExtractResult', 'ConvertResult', 'BatchResult', 'LookupResult',
+    'DiffResult', 'MergeResult', 'VerifyResult',
+    'parse_cache',
+]
@@ -7,22 +7,37 @@ Provides CLI tools for extracting and converting language files.
 
 import sys
 import os
-import logging
-from modules.extract import extract_strings
-from modules.convert import convert_to_dat
+import argparse
 
-# Setup logging to file
-logging.basicConfig(
-    filename='langtool.log', filemode='a', level=logging.INFO,
-    format='%(asctime)s %(levelname)s: %(message)s'
-)
+# Only sys and os are imported up front: each action imports the modules it
+# needs, so a lookup or --help does not pay for the whole tool.
 
-def exit_with_pause():
+# Exit codes
+EXIT_OK = 0
+EXIT_FAILURE = 1  # The operation ran and failed (or a batch had failures)
+EXIT_USAGE = 2    # Invalid arguments or missing input files
+
+
+def setup_logging():
+    """
+    Send log records to langtool.log. Only the CLI configures logging;
+    library callers decide for themselves. The file is opened on the
+    first record, so runs that log nothing never touch it.
+    """
+    import logging
+    handler = logging.FileHandler('langtool.log', mode='a', delay=True)
+    logging.basicConfig(handlers=[handler], level=logging.INFO,
+                        format='%(asctime)s %(levelname)s: %(message)s')
+
+
+def pause_if_interactive():
     """
-    Exit program with pause to keep window open.
+    Keep the console of a double-clicked Windows executable open.
+    Scripts (stdin not a terminal) and the Python script are never blocked.
     """
-    input("Press Enter to exit...")
-    sys.exit()
+    if getattr(sys, 'frozen', False) and sys.stdin is not None and sys.stdin.isatty():
+        input("Press Enter to exit...")
+
 
 def print_usage():
     """
@@ -32,88 +47,617 @@ def print_usage():
     print(f"""
 Usage:
   {executable_name} --extract --dat input.dat --bed input.bed --txt output.txt
-  {executable_name} --convert --dat input.dat --bed input.bed --txt input.txt --out output.dat
+  {executable_name} --convert --dat input.dat --bed input.bed --txt input.txt --out output.dat [--dedupe] [--incremental]
+  {executable_name} --extract --batch dat_dir --txt txt_dir [--bed input.bed] [--workers N | --concurrency N]
+  {executable_name} --extract --merge dat_dir --txt merged.csv [--bed input.bed]
+  {executable_name} --convert --batch dat_dir --txt txt_dir --out out_dir [--bed input.bed] [--workers N | --concurrency N]
+  {executable_name} --convert --watch --dat input.dat --bed input.bed --txt input.txt --out output.dat [--interval S]
+  {executable_name} --get ID_OR_NAME --dat input.dat [--bed input.bed]
+  {executable_name} --diff old.dat new.dat [--bed input.bed] [--format text|json]
+  {executable_name} --diff old.txt new.txt [--bed input.bed] [--format text|json]
+  {executable_name} --verify dat_dir [--bed input.bed] [--workers N] [--format text|json]
+  {executable_name} --serve [--socket path]
 
 Options:
   --extract            Extract text from .dat to .txt
   --convert            Convert .txt back to .dat
+  --get, --lookup      Print one string by numeric ID or .bed name from --dat or --txt
+                       (name lookups need --bed)
+  --diff               Compare two .dat files and list modified, added and removed strings
+                       (or two .txt files, through their .idx sidecar indexes)
+  --verify             Check every .dat in a directory or glob in parallel: structure,
+                       BLAKE2 checksums per file and string, and string count against
+                       --bed (default: languages.bed next to each .dat)
+  --format             Output format for --diff and --verify: text (default) or json
   --dat, -d            Path to .dat file
   --bed, -b            Path to .bed file
   --txt, -t            Path to .txt file (input or output)
   --out, -o            Output .dat file (for --convert)
   --original-d, -od    Path to original .dat file (for --extract, outputs original text as //...//)
+  --dedupe             Store identical strings once in the output .dat (for --convert)
+  --incremental        Re-encode only changed strings, reusing the previous --out .dat
+  --manifest           Hash manifest for --incremental (default: <out>.manifest.json)
+  --index              Write a sidecar block index (<txt>.idx) on --extract; on --convert
+                       use it to skip parsing blocks unchanged since the last convert
+  --batch              Directory or glob of .dat files to process in parallel;
+                       --txt and --out are then directories and --bed defaults
+                       to languages.bed next to each .dat
+  --workers            Number of worker processes for --batch, --verify (default: CPU count)
+  --concurrency        Process --batch files on N threads with overlapping reads and
+                       writes instead of worker processes (for network storage)
+  --merge              Directory or glob of .dat files to extract side by side into one
+                       --txt file (.csv, .tsv or .txt); a directory uses the languages
+                       listed in its version.ini
+  --watch              With --convert (single file or --batch): keep running and reconvert
+                       whenever a .txt, .bed, template .dat or version.ini changes
+  --interval           Seconds between checks in --watch mode (default: 0.5)
+  --cache              File to load/save parsed BED and version.ini data between runs
+  --stats              Print per-stage timings and counters: text or json
+  --profile            Write cProfile statistics of the run to this file (read with pstats)
+  --serve              Run as a JSON-RPC server on stdin/stdout with warm caches
+  --socket             Serve on this Unix socket instead of stdin/stdout (with --serve)
 
 Examples:
   {executable_name} --extract --dat language0.dat --bed languages.bed --txt language0.txt
   {executable_name} --extract --dat language0.dat --bed languages.bed --txt language0.txt --original-d language0.dat
   {executable_name} --convert --dat language0.dat --bed languages.bed --txt language0.txt --out new_language0.dat
+  {executable_name} --extract --batch data/language --txt translations --workers 4
+  {executable_name} --extract --merge data/language --txt all_languages.csv
+  {executable_name} --get MENU_OK --dat language0.dat --bed languages.bed
+  {executable_name} --diff old/language0.dat new/language0.dat --bed languages.bed
+  {executable_name} --verify build/language --format json > report.json
+  {executable_name} --convert --dat language0.dat --bed languages.bed --txt language0.txt --out new_language0.dat --stats json
+
+Exit codes: 0 success, 1 the operation failed, 2 invalid arguments or missing files.
 """)
-    exit_with_pause()
 
 
-def main():
+def print_extract_result(result):
     """
-    Main entry point: parse CLI arguments and run the requested action.
+    Print diagnostics of an ExtractResult.
     """
-    args = sys.argv[1:]
-    if not args:
-        print_usage()
+    print(f"\nProcessing files:")
+    print(f"- DAT file: {result.dat_path}{result.language}")
+    print(f"- BED file: {result.bed_path}")
+    print(f"- Output: {result.output_path}")
+    if result.original_dat_path:
+        print(f"- Original DAT: {result.original_dat_path}{result.original_language}")
+    print(f"\nBED file info:")
+    print(f"- Found {result.bed_ids} string IDs")
+    print(f"- Expected blocks: {result.expected_blocks}")
+    for msg in result.warnings:
+        print(msg)
+    if result.ok:
+        print(f"\nDAT file structure:")
+        print(f"- Number of strings: {result.str_num}")
+        print(f"- Text section offset: 0x{result.text_offset:X}")
+        print(f"- Header size: {result.text_offset} bytes")
+        print(f"- Total file size: {result.file_size} bytes")
+        print(f"- Text section size: {result.file_size - result.text_offset} bytes")
+        print(f"\nExtraction complete:")
+        print_block_counts(result)
+    else:
+        print(result.error)
+
+
+def print_convert_result(result):
+    """
+    Print diagnostics of a ConvertResult.
+    """
+    print(f"\nProcessing files:")
+    print(f"- Input text: {result.txt_path}")
+    print(f"- Template DAT: {result.input_dat_path}{result.language}")
+    print(f"- Output DAT: {result.output_dat_path}")
+    if 'parse_txt' in result.timings:
+        print(f"\nText file info:")
+        print(f"- Found {result.total_blocks} text blocks")
+    for msg in result.warnings:
+        print(msg)
+    if result.ok:
+        print(f"\nConversion diagnostics:")
+        print_block_counts(result)
+        if result.incremental:
+            print(f"- Incremental update: {result.update_status}, {result.changed_strings} changed strings")
+        if result.dedupe and result.update_status in ('full', 'rebuilt'):
+            print(f"- Bytes saved by deduplication: {result.saved_bytes}")
+        if result.validation is not None:
+            for msg in result.validation.messages():
+                print(msg)
+    else:
+        print(result.error)
+
+
+def print_lookup_result(result):
+    """
+    Print a LookupResult as a .txt block, or its error.
+    """
+    if result.ok:
+        from modules.txtblock import format_text_block
+        name = result.name if result.name is not None else f"String_{result.string_id}"
+        print(format_text_block(result.string_id, name, result.text), end='')
+    else:
+        print(result.error)
+
+
+def print_diff_result(result, fmt='text'):
+    """
+    Print a DiffResult as a readable report or as JSON.
+    """
+    if fmt == 'json':
+        import json
+        print(json.dumps(result.to_dict(), ensure_ascii=False))
+        return
+    if not result.ok:
+        print(result.error)
         return
-    action = None
-    dat_path = None
-    bed_path = None
-    txt_path = None
-    out_path = None  # Output path for .dat
-    original_dat_path = None  # Path to original dat file
-    i = 0
-    while i < len(args):
-        if args[i] == '--extract':
-            action = 'extract'
-            i += 1
-        elif args[i] == '--convert':
-            action = 'convert'
-            i += 1
-        elif args[i] in ('--dat', '-d'):
-            if i + 1 < len(args):
-                dat_path = args[i + 1]
-                i += 2
-            else:
-                print("Error: Missing value for --dat/-d")
-                return
-        elif args[i] in ('--bed', '-b'):
-            if i + 1 < len(args):
-                bed_path = args[i + 1]
-                i += 2
-            else:
-                print("Error: Missing value for --bed/-b")
-                return
-        elif args[i] in ('--txt', '-t'):
-            if i + 1 < len(args):
-                txt_path = args[i + 1]
-                i += 2
-            else:
-                print("Error: Missing value for --txt/-t")
-                return
-        elif args[i] in ('--out', '-o'):
-            if i + 1 < len(args):
-                out_path = args[i + 1]
-                i += 2
-            else:
-                print("Error: Missing value for --out/-o")
-                return
-        elif args[i] in ('--original-d', '-od'):
-            if i + 1 < len(args):
-                original_dat_path = args[i + 1]
-                i += 2
-            else:
-                print("Error: Missing value for --original-d/-od")
-                return
+    print(f"\nComparing:")
+    kind = 'TXT' if result.old_path.lower().endswith('.txt') else 'DAT'
+    print(f"- Old {kind}: {result.old_path} ({result.old_count} strings)")
+    print(f"- New {kind}: {result.new_path} ({result.new_count} strings)")
+    print(f"- Unchanged: {result.unchanged}")
+    print(f"- Modified: {len(result.modified)}")
+    print(f"- Added: {len(result.added)}")
+    print(f"- Removed: {len(result.removed)}")
+    for mark, entries in (('~', result.modified), ('+', result.added), ('-', result.removed)):
+        for entry in entries:
+            name = entry.name if entry.name is not None else f"String_{entry.string_id}"
+            print(f"{mark} [String ID: {entry.string_id}] [{name}]")
+            if entry.old_text is not None:
+                print(f"    - {entry.old_text.replace(chr(10), '{LF}')}")
+            if entry.new_text is not None:
+                print(f"    + {entry.new_text.replace(chr(10), '{LF}')}")
+
+
+def print_verify_result(batch, fmt='text'):
+    """
+    Print a --verify BatchResult as a per-file report or as JSON.
+    """
+    if fmt == 'json':
+        import json
+        print(json.dumps(batch.to_dict(), ensure_ascii=False))
+        return
+    if batch.error:
+        print(batch.error)
+        return
+    print(f"\nVerifying {batch.pattern}:")
+    warnings = 0
+    for dat_path, result in batch.items:
+        if result:
+            print(f"  OK     {dat_path} ({result.str_num} strings, blake2b {result.checksum})")
         else:
-            print(f"Error: Unknown argument '{args[i]}'")
+            print(f"  FAILED {dat_path}: {result.error}")
+            if result.validation is not None:
+                for msg in result.validation.error_messages():
+                    print(f"    {msg}")
+        for msg in result.warnings:
+            print(f"    {msg}")
+        warnings += len(result.warnings)
+    print(f"\nVerify summary:")
+    print(f"- Files: {len(batch.items)}")
+    print(f"- Passed: {len(batch.items) - len(batch.failed)}")
+    print(f"- Failed: {len(batch.failed)}")
+    print(f"- Strings: {sum(result.str_num for _, result in batch.items)}")
+    print(f"- Warnings: {warnings}")
+    print(f"- Wall time: {batch.timings['total']:.2f} s")
+
+
+def print_block_counts(result):
+    """
+    Print the block counters shared by extract and convert diagnostics.
+    """
+    print(f"- Total blocks: {result.total_blocks}")
+    print(f"- Empty blocks: {result.empty_blocks}")
+    print(f"- Invalid blocks: {result.invalid_blocks}")
+    print(f"- Multiline blocks: {result.multiline_blocks}")
+    print(f"- Single line blocks: {result.single_blocks}")
+
+
+def print_merge_result(result):
+    """
+    Print diagnostics of a MergeResult.
+    """
+    print(f"\nProcessing files:")
+    for dat_path, column, str_num in zip(result.dat_paths, result.columns, result.str_nums):
+        print(f"- DAT file: {dat_path} [{column}] ({str_num} strings)")
+    print(f"- BED file: {result.bed_path}")
+    print(f"- Output: {result.output_path} ({result.output_format})")
+    for msg in result.warnings:
+        print(msg)
+    if result.ok:
+        print(f"\nMerged extraction complete:")
+        print(f"- Languages: {len(result.columns)}")
+        print_block_counts(result)
+    else:
+        print(result.error)
+
+
+def print_batch_result(batch):
+    """
+    Print per-file diagnostics of a BatchResult followed by a combined summary.
+    """
+    if batch.error:
+        print(batch.error)
+        return
+    print_result = print_extract_result if batch.action == 'extract' else print_convert_result
+    for _, result in batch.items:
+        print_result(result)
+    totals = batch.totals()
+    print(f"\nBatch summary:")
+    print(f"- Files matched: {len(batch.dat_paths)}")
+    print(f"- Succeeded: {len(batch.items) - len(batch.failed)}")
+    print(f"- Failed: {len(batch.failed)}")
+    print(f"- Skipped (no .txt): {len(batch.skipped)}")
+    print(f"- Total blocks: {totals['total_blocks']}")
+    print(f"- Empty blocks: {totals['empty_blocks']}")
+    print(f"- Invalid blocks: {totals['invalid_blocks']}")
+    print(f"- Multiline blocks: {totals['multiline_blocks']}")
+    print(f"- Single line blocks: {totals['single_blocks']}")
+    print(f"- Warnings: {totals['warnings']}")
+    print(f"- Wall time: {batch.timings['total']:.2f} s")
+    for dat_path, result in batch.items:
+        print(f"  {'OK    ' if result else 'FAILED'} {dat_path} ({result.timings['total']:.2f} s)")
+    for dat_path in batch.skipped:
+        print(f"  SKIP   {dat_path}")
+
+
+def print_stats(outcome, fmt):
+    """
+    Print the timings and counters of a result or BatchResult, as text or as one JSON line.
+    """
+    report = {'ok': bool(outcome), **outcome.as_dict()}
+    items = getattr(outcome, 'items', None)
+    if items is not None:
+        report['files'] = [{'dat': dat_path, 'ok': bool(result), **result.as_dict()} for dat_path, result in items]
+    if fmt == 'json':
+        import json
+        print(json.dumps(report))
+        return
+    print(f"\nStage timings:")
+    for name, seconds in report['timings'].items():
+        print(f"- {name}: {seconds * 1000:.2f} ms")
+    if report['counters']:
+        print(f"Counters:")
+        for name, value in report['counters'].items():
+            print(f"- {name}: {value}")
+    for entry in report.get('files', []):
+        stages = ', '.join(f"{name}={seconds * 1000:.2f} ms" for name, seconds in entry['timings'].items())
+        print(f"  {entry['dat']}: {stages}")
+
+
+class CliParser(argparse.ArgumentParser):
+    """
+    ArgumentParser that reports errors in the tool's own style and exits with EXIT_USAGE.
+    """
+
+    def error(self, message):
+        print(f"Error: {message}")
+        sys.exit(EXIT_USAGE)
+
+
+def positive_int(value):
+    if not value.isdigit() or int(value) <= 0:
+        raise argparse.ArgumentTypeError(f"requires a positive number, got '{value}'")
+    return int(value)
+
+
+def positive_float(value):
+    try:
+        number = float(value)
+    except ValueError:
+        number = 0
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"requires a positive number of seconds, got '{value}'")
+    return number
+
+
+def build_parser():
+    """
+    Command-line parser. Option names and short forms match the usage text;
+    help is printed by print_usage instead of argparse.
+    """
+    parser = CliParser(add_help=False, allow_abbrev=False)
+    parser.add_argument('-h', '--help', action='store_true')
+    actions = parser.add_mutually_exclusive_group()
+    actions.add_argument('--extract', dest='action', action='store_const', const='extract')
+    actions.add_argument('--convert', dest='action', action='store_const', const='convert')
+    actions.add_argument('--get', '--lookup', dest='lookup_key', metavar='ID_OR_NAME')
+    actions.add_argument('--diff', dest='diff_paths', nargs=2, metavar=('OLD', 'NEW'))
+    actions.add_argument('--verify', dest='verify_pattern', metavar='PATTERN')
+    actions.add_argument('--serve', action='store_true')
+    parser.add_argument('--format', dest='output_format', choices=('text', 'json'), default='text')
+    parser.add_argument('--dat', '-d', dest='dat_path')
+    parser.add_argument('--bed', '-b', dest='bed_path')
+    parser.add_argument('--txt', '-t', dest='txt_path')
+    parser.add_argument('--out', '-o', dest='out_path')
+    parser.add_argument('--original-d', '-od', dest='original_dat_path')
+    parser.add_argument('--dedupe', action='store_true')
+    parser.add_argument('--incremental', action='store_true')
+    parser.add_argument('--manifest', dest='manifest_path')
+    parser.add_argument('--index', action='store_true')
+    parser.add_argument('--batch', dest='batch_pattern')
+    parser.add_argument('--workers', type=positive_int)
+    parser.add_argument('--concurrency', type=positive_int)
+    parser.add_argument('--merge', dest='merge_pattern')
+    parser.add_argument('--watch', action='store_true')
+    parser.add_argument('--interval', type=positive_float)
+    parser.add_argument('--cache', dest='cache_path')
+    parser.add_argument('--stats', dest='stats_format', choices=('text', 'json'))
+    parser.add_argument('--profile', dest='profile_path')
+    parser.add_argument('--socket', dest='socket_path')
+    return parser
+
+
+def exit_code(outcome):
+    """
+    Map the value returned by a run_* function to the process exit code.
+    """
+    if outcome is None:
+        return EXIT_USAGE
+    return EXIT_OK if outcome else EXIT_FAILURE
+
+
+def main(argv=None):
+    """
+    Main entry point: parse CLI arguments, run the requested action and
+    return the exit code.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print_usage()
+        pause_if_interactive()
+        return EXIT_USAGE
+    args = build_parser().parse_args(argv)
+    if args.help:
+        print_usage()
+        return EXIT_OK
+    action = args.action
+    if args.lookup_key is not None:
+        action = 'lookup'
+    elif args.diff_paths:
+        action = 'diff'
+    elif args.verify_pattern:
+        action = 'verify'
+    if not action and not args.serve:
+        print("Error: Must specify --extract, --convert, --get, --diff, --verify or --serve")
+        return EXIT_USAGE
+    setup_logging()
+    from modules.utils import parse_cache
+    if args.cache_path:
+        parse_cache.load(args.cache_path)
+    if args.serve or args.watch:
+        from modules import utf16
+        utf16.USE_NUMPY = True  # Long-running: importing NumPy once pays off
+        stdin_blocked = False
+        try:
+            if args.serve:
+                from modules.server import run_server
+                try:
+                    stdin_blocked = run_server(args.socket_path)
+                except RuntimeError as e:
+                    print(f"Error: {e}")
+                    return EXIT_USAGE
+                return EXIT_OK
+            return exit_code(run_watch(action, args.dat_path, args.bed_path, args.txt_path, args.out_path,
+                                       args.dedupe, args.batch_pattern, args.incremental, args.index,
+                                       args.interval))
+        finally:
+            if args.cache_path:
+                save_parse_cache(parse_cache, args.cache_path)
+            if stdin_blocked:  # Shut down with stdin still open; see run_server
+                import logging
+                logging.shutdown()
+                sys.stdout.flush()
+                os._exit(EXIT_OK)
+    profiler = None
+    if args.profile_path:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        if action == 'lookup':
+            outcome = run_lookup(args.lookup_key, args.dat_path or args.txt_path, args.bed_path)
+        elif action == 'diff':
+            outcome = run_diff(tuple(args.diff_paths), args.bed_path, args.output_format)
+        elif action == 'verify':
+            outcome = run_verify(args.verify_pattern, args.bed_path, args.workers, args.output_format)
+        elif args.merge_pattern:
+            outcome = run_merge(action, args.merge_pattern, args.bed_path, args.txt_path, args.workers)
+        else:
+            outcome = run_action(action, args.dat_path, args.bed_path, args.txt_path, args.out_path,
+                                 args.original_dat_path, args.dedupe, args.batch_pattern, args.workers,
+                                 args.concurrency, args.incremental, args.manifest_path, args.index)
+    finally:
+        if profiler:
+            profiler.disable()
+            try:
+                profiler.dump_stats(args.profile_path)
+                print(f"Profile written to {args.profile_path}")
+            except OSError as e:
+                print(f"Warning: Could not write profile to {args.profile_path}: {e}")
+        if args.cache_path:
+            import logging
+            save_parse_cache(parse_cache, args.cache_path)
+            logging.info(f"Parse cache: {parse_cache.stats()}")
+    if args.stats_format and outcome is not None:
+        print_stats(outcome, args.stats_format)
+    return exit_code(outcome)
+
+
+def save_parse_cache(parse_cache, cache_path):
+    """
+    Save the parse cache for --cache. A failed save is reported but does not
+    change the outcome of the operation that already ran.
+    """
+    try:
+        parse_cache.save(cache_path)
+    except OSError as e:
+        print(f"Warning: Could not save parse cache to {cache_path}: {e}")
+
+
+def run_lookup(key, source_path, bed_path):
+    """
+    Validate arguments for --get and print the string from a .dat or .txt.
+    Returns the LookupResult, or None if the arguments were rejected.
+    """
+    if not source_path:
+        print("Error: Missing required arguments for lookup.\nRequired: --get ID_OR_NAME --dat input.dat (or --txt input.txt) [--bed input.bed]")
+        return
+    for path in (source_path, bed_path):
+        if path and not os.path.exists(path):
+            print(f"Error: File {path} not found.")
+            return
+    from modules.lookup import lookup_string
+    result = lookup_string(source_path, key, bed_path)
+    print_lookup_result(result)
+    return result
+
+
+def run_diff(diff_paths, bed_path, output_format):
+    """
+    Validate arguments for --diff and print the comparison.
+    Returns the DiffResult, or None if the arguments were rejected.
+    """
+    for path in diff_paths + (bed_path,):
+        if path and not os.path.exists(path):
+            print(f"Error: File {path} not found.")
             return
-    if not action:
-        print("Error: Must specify --extract or --convert")
+    txt_files = [path.lower().endswith('.txt') for path in diff_paths]
+    if txt_files[0] != txt_files[1]:
+        print("Error: --diff compares two .dat files or two .txt files")
+        return
+    if txt_files[0]:
+        from modules.diff import diff_txt_files
+        result = diff_txt_files(*diff_paths, bed_path=bed_path)
+    else:
+        from modules.diff import diff_dat_files
+        result = diff_dat_files(*diff_paths, bed_path=bed_path)
+    print_diff_result(result, output_format)
+    return result
+
+
+def run_verify(verify_pattern, bed_path, workers, output_format):
+    """
+    Validate arguments for --verify and print the report.
+    Returns the BatchResult, or None if the arguments were rejected.
+    """
+    if bed_path and not os.path.exists(bed_path):
+        print(f"Error: File {bed_path} not found.")
+        return
+    from modules.verify import verify_dat_files
+    batch = verify_dat_files(verify_pattern, bed_path=bed_path, workers=workers)
+    print_verify_result(batch, output_format)
+    return batch
+
+
+def run_merge(action, merge_pattern, bed_path, txt_path, workers):
+    """
+    Validate arguments for --merge and run the merged extraction.
+    Returns the MergeResult, or None if the arguments were rejected.
+    """
+    if action != 'extract' or not txt_path:
+        print("Error: Missing required arguments for merged extraction.\nRequired: --extract --merge dat_dir --txt output.csv")
+        return
+    from modules.merge import extract_merged, find_language_dats
+    dat_paths = find_language_dats(merge_pattern)
+    if not dat_paths:
+        print(f"Error: No .dat files found for {merge_pattern}")
+        return
+    if not bed_path:
+        bed_path = os.path.join(os.path.dirname(dat_paths[0]), 'languages.bed')
+        bed_path = bed_path if os.path.exists(bed_path) else None
+    elif not os.path.exists(bed_path):
+        print(f"Error: File {bed_path} not found.")
+        return
+    result = extract_merged(dat_paths, bed_path, txt_path, workers=workers)
+    print_merge_result(result)
+    if result:
+        print(f"Text successfully extracted to {txt_path}")
+    else:
+        print("An error occurred while extracting text")
+    return result
+
+
+def print_watch_cycle(changed, batch):
+    """
+    Print one --watch rebuild: what changed, per-file status and the latency.
+    """
+    import time
+    stamp = time.strftime('%H:%M:%S')
+    if changed:
+        print(f"\n[{stamp}] Changed: {', '.join(changed)}")
+    else:
+        print(f"\n[{stamp}] Initial build")
+    for dat_path, result in batch.items:
+        if result:
+            warnings = f", {len(result.warnings)} warnings" if result.warnings else ''
+            print(f"  OK     {result.output_dat_path} ({result.timings['total'] * 1000:.1f} ms{warnings})")
+        else:
+            print(f"  FAILED {result.output_dat_path}: {result.error}")
+    print(f"[{stamp}] Rebuilt {len(batch.items)} file(s) in {batch.timings['total'] * 1000:.1f} ms; watching for changes (Ctrl+C to stop)", flush=True)
+
+
+def run_watch(action, dat_path, bed_path, txt_path, out_path, dedupe, batch_pattern, incremental, index, interval):
+    """
+    Validate arguments for --watch and reconvert on every input change until interrupted.
+    Returns True once stopped, or None if the arguments were rejected.
+    """
+    if action != 'convert':
+        print("Error: --watch requires --convert")
         return
+    if batch_pattern:
+        if not txt_path or not out_path:
+            print("Error: Missing required arguments for batch mode.\nRequired: --batch dat_dir --txt txt_dir --out out_dir")
+            return
+        from modules.batch import plan_batch
+        from modules.results import BatchResult
+        batch = BatchResult(action, batch_pattern)
+        jobs = plan_batch(batch, txt_path, out_path, bed_path, dedupe, incremental, index)
+        if batch.error:
+            print(batch.error)
+            return
+    else:
+        if not all([dat_path, bed_path, txt_path, out_path]):
+            print("Error: Missing required arguments for conversion.\nRequired: --dat input.dat --bed input.bed --txt input.txt --out output.dat")
+            return
+        jobs = [(action, dat_path, bed_path, txt_path, out_path, None, None, dedupe, incremental, index)]
+    # A batch job's languages.bed is optional, as in plain --batch; only a given --bed must exist
+    paths = set(job[i] for job in jobs for i in (1, 3)) | ({bed_path} if bed_path else set())
+    for path in sorted(paths):
+        if not os.path.exists(path):
+            print(f"Error: File {path} not found.")
+            return
+    from modules.watch import watch_convert, POLL_INTERVAL
+    try:
+        watch_convert(jobs, interval=interval or POLL_INTERVAL, on_cycle=print_watch_cycle)
+    except KeyboardInterrupt:
+        print("\nWatch stopped.")
+    return True
+
+
+def run_action(action, dat_path, bed_path, txt_path, out_path, original_dat_path,
+               dedupe, batch_pattern, workers, concurrency, incremental, manifest_path, index):
+    """
+    Validate arguments for the requested action and run it.
+    Returns the result object, or None if the arguments were rejected.
+    """
+    if batch_pattern:
+        if not txt_path or (action == 'convert' and not out_path):
+            print("Error: Missing required arguments for batch mode.\nRequired: --batch dat_dir --txt txt_dir (and --out out_dir for --convert)")
+            return
+        if bed_path and not os.path.exists(bed_path):
+            print(f"Error: File {bed_path} not found.")
+            return
+        if concurrency:
+            from modules.aio import run_async, run_batch_async
+            batch = run_async(run_batch_async(action, batch_pattern, txt_path, out_dir=out_path, bed_path=bed_path,
+                                              concurrency=concurrency, dedupe=dedupe, incremental=incremental,
+                                              index=index))
+        else:
+            from modules.batch import run_batch
+            batch = run_batch(action, batch_pattern, txt_path, out_dir=out_path, bed_path=bed_path,
+                              workers=workers, dedupe=dedupe, incremental=incremental, index=index)
+        print_batch_result(batch)
+        return batch
     if action == 'extract':
         if not all([dat_path, bed_path, txt_path]):
             print("Error: Missing required arguments for extraction.\nRequired: --dat input.dat --bed input.bed --txt output.txt")
@@ -132,15 +676,26 @@ def main():
         print(f"Error: File {txt_path} not found.")
         return
     if action == 'extract':
-        if extract_strings(dat_path, bed_path, txt_path, original_dat_path=original_dat_path):
+        from modules.extract import extract_strings
+        result = extract_strings(dat_path, bed_path, txt_path, original_dat_path=original_dat_path, index=index)
+        print_extract_result(result)
+        if result:
             print(f"Text successfully extracted to {txt_path}")
         else:
             print("An error occurred while extracting text")
     else:  # action == 'convert'
-        if convert_to_dat(txt_path, dat_path, out_path, bed_path):
+        from modules.convert import convert_to_dat
+        result = convert_to_dat(txt_path, dat_path, out_path, bed_path, dedupe=dedupe,
+                                incremental=incremental, manifest_path=manifest_path, index=index)
+        print_convert_result(result)
+        if result:
             print(f"Text successfully converted to {out_path}")
         else:
             print("An error occurred while converting text")
+    return result
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    if getattr(sys, 'frozen', False):
+        from multiprocessing import freeze_support
+        freeze_support()  # Required for --batch workers in frozen executables
+    sys.exit(main())
\ No newline at end of file
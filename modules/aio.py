@@ -0,0 +1,165 @@
+"""
+Asyncio entry points for LangTool X modules.
+
+extract_async and convert_async run extract_strings and convert_to_dat in a
+bounded thread pool, so the file reads and writes of many files overlap while
+the event loop stays free. A Limiter caps how many run at once; coroutines
+waiting for a slot are suspended, which is what holds back whatever feeds
+them jobs. Suited to I/O-bound work such as language packs on network
+storage; for CPU-bound batches on local disks run_batch (processes) is faster.
+"""
+
+import asyncio
+import logging
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from modules.extract import extract_strings
+from modules.convert import convert_to_dat
+from modules.batch import plan_batch
+from modules.results import BatchResult
+
+DEFAULT_CONCURRENCY = 8
+
+logger = logging.getLogger('langtool')
+
+
+class Limiter:
+    """
+    Thread pool of `concurrency` workers and a semaphore of the same size.
+    The semaphore keeps work out of the executor's unbounded queue until a
+    thread is free. Use on a single event loop, e.g. `async with Limiter(4) as limiter:`.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.concurrency = concurrency
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        self._semaphore = None  # Created on first use so it binds to the running loop
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Run func(*args, **kwargs) in the pool once a slot is free and return its result.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            return await asyncio.get_event_loop().run_in_executor(self.executor, partial(func, *args, **kwargs))
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+def _run(limiter, func, *args, **kwargs):
+    if limiter is not None:
+        return limiter.run(func, *args, **kwargs)
+    return asyncio.get_event_loop().run_in_executor(None, partial(func, *args, **kwargs))
+
+
+async def extract_async(dat_path, bed_path, output_path, limiter=None, **options):
+    """
+    Coroutine form of extract_strings; options are passed through.
+    Runs in limiter's pool, or in the loop's default executor without one.
+    Returns ExtractResult.
+    """
+    return await _run(limiter, extract_strings, dat_path, bed_path, output_path, **options)
+
+
+async def convert_async(txt_path, input_dat_path, output_dat_path, bed_path, limiter=None, **options):
+    """
+    Coroutine form of convert_to_dat; options are passed through.
+    Runs in limiter's pool, or in the loop's default executor without one.
+    Returns ConvertResult.
+    """
+    return await _run(limiter, convert_to_dat, txt_path, input_dat_path, output_dat_path, bed_path, **options)
+
+
+async def _run_job_async(job, limiter):
+    """
+    Async counterpart of batch._run_job. Returns (dat_path, result).
+    """
+    action, dat_path, bed_path, txt_path, out_path, bed_data, languages, dedupe, incremental, index = job
+    if action == 'extract':
+        return dat_path, await extract_async(dat_path, bed_path, txt_path, limiter, bed_data=bed_data,
+                                             languages=languages, index=index)
+    # action == 'convert'
+    return dat_path, await convert_async(txt_path, dat_path, out_path, bed_path, limiter, dedupe=dedupe,
+                                         bed_data=bed_data, languages=languages, incremental=incremental,
+                                         index=index)
+
+
+async def iter_jobs_async(jobs, limiter):
+    """
+    Run batch job tuples (see plan_batch) and yield (dat_path, result) in
+    completion order. Jobs are taken from the iterable only when a slot is
+    free, and at most limiter.concurrency finished results wait for the
+    consumer, so neither a lazy job source nor a slow consumer lets work
+    pile up in memory.
+    """
+    jobs = iter(jobs)
+    results = asyncio.Queue(maxsize=limiter.concurrency)
+    done = object()
+
+    async def worker():
+        try:
+            for job in jobs:  # Shared iterator: each job goes to exactly one worker
+                await results.put(await _run_job_async(job, limiter))
+            await results.put(done)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await results.put(e)
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(limiter.concurrency)]
+    try:
+        running = len(workers)
+        while running:
+            item = await results.get()
+            if item is done:
+                running -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        for task in workers:
+            task.cancel()
+
+
+async def run_batch_async(action, pattern, txt_dir, out_dir=None, bed_path=None, concurrency=DEFAULT_CONCURRENCY,
+                          dedupe=False, incremental=False, index=False):
+    """
+    Same as run_batch, with the files processed on `concurrency` threads
+    under asyncio instead of in worker processes.
+    Returns BatchResult holding the per-file results in input order.
+    """
+    batch = BatchResult(action, pattern)
+    loop = asyncio.get_event_loop()
+    jobs = await loop.run_in_executor(None, partial(plan_batch, batch, txt_dir, out_dir, bed_path,
+                                                    dedupe, incremental, index))
+    if batch.error:
+        return batch
+    order = {dat_path: i for i, dat_path in enumerate(batch.dat_paths)}
+    with batch.span('total'):
+        async with Limiter(concurrency) as limiter:
+            items = [item async for item in iter_jobs_async(jobs, limiter)]
+    batch.items = sorted(items, key=lambda item: order[item[0]])
+    logger.info(f"Async batch {action}: matched={len(batch.dat_paths)}, failed={len(batch.failed)}, skipped={len(batch.skipped)}")
+    return batch
+
+
+def run_async(coro):
+    """
+    Run a coroutine to completion on a new event loop (asyncio.run needs Python 3.7).
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
@@ -0,0 +1,117 @@
+"""
+Batch processing for LangTool X modules.
+"""
+
+import os
+import glob
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from modules.utils import read_languages_from_ini_cached, read_bed_file_cached
+from modules.extract import extract_strings
+from modules.convert import convert_to_dat
+from modules.results import BatchResult
+
+logger = logging.getLogger('langtool')
+
+
+def find_dat_files(pattern):
+    """
+    Expand a directory or glob pattern into a sorted list of .dat paths.
+    A directory is searched for language*.dat files.
+    """
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, 'language*.dat')
+    return sorted(path for path in glob.glob(pattern) if os.path.isfile(path))
+
+
+def _run_job(job):
+    """
+    Run one extract/convert job in a worker process.
+    Returns (dat_path, ExtractResult or ConvertResult).
+    """
+    action, dat_path, bed_path, txt_path, out_path, bed_data, languages, dedupe, incremental, index = job
+    if action == 'extract':
+        return dat_path, extract_strings(dat_path, bed_path, txt_path, bed_data=bed_data, languages=languages,
+                                         index=index)
+    # action == 'convert'
+    return dat_path, convert_to_dat(txt_path, dat_path, out_path, bed_path, dedupe=dedupe,
+                                    bed_data=bed_data, languages=languages, incremental=incremental,
+                                    index=index)
+
+
+def run_batch(action, pattern, txt_dir, out_dir=None, bed_path=None, workers=None, dedupe=False,
+              incremental=False, index=False):
+    """
+    Extract or convert every .dat matched by pattern in parallel.
+    For extract, .txt files are written to txt_dir; for convert, they are read
+    from txt_dir and new .dat files are written to out_dir.
+    BED and version.ini files are parsed once per directory (or once in total if
+    bed_path is given) and shared with the workers.
+    Returns BatchResult holding the per-file results in input order.
+    """
+    batch = BatchResult(action, pattern)
+    jobs = plan_batch(batch, txt_dir, out_dir, bed_path, dedupe, incremental, index)
+    if batch.error:
+        return batch
+    with batch.span('total'):
+        if jobs:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                batch.items = list(pool.map(_run_job, jobs))
+    logger.info(f"Batch {action}: matched={len(batch.dat_paths)}, failed={len(batch.failed)}, skipped={len(batch.skipped)}")
+    return batch
+
+
+def plan_batch(batch, txt_dir, out_dir=None, bed_path=None, dedupe=False, incremental=False, index=False):
+    """
+    Match batch.pattern and build one job tuple per file for _run_job.
+    When files come from several directories, each one's outputs go to its
+    path relative to the common parent of all of them. Output directories are
+    created; convert jobs without a .txt are recorded in batch.skipped.
+    Sets batch.error and returns [] if nothing matched or if two files would
+    be written to the same path.
+    """
+    action = batch.action
+    dat_paths = batch.dat_paths = find_dat_files(batch.pattern)
+    if not dat_paths:
+        batch.error = f"Error: No .dat files found for {batch.pattern}"
+        return []
+    directories = sorted(set(os.path.dirname(path) for path in dat_paths))
+    # Keep outputs of different directories apart: games/a/data/language -> a/data/language
+    root = None
+    if len(directories) > 1:
+        try:
+            root = os.path.commonpath([os.path.abspath(d) for d in directories])
+        except ValueError:  # Different drives on Windows
+            batch.error = f"Error: Files matched by {batch.pattern} have no common parent directory"
+            return []
+    shared_bed = read_bed_file_cached(bed_path) if bed_path else None
+    bed_by_dir = {}
+    languages_by_dir = {}
+    for directory in directories:
+        languages_by_dir[directory] = read_languages_from_ini_cached(os.path.join(directory, 'version.ini'))
+        if shared_bed is None:
+            bed_by_dir[directory] = read_bed_file_cached(os.path.join(directory, 'languages.bed'))
+    jobs = []
+    writers = {}
+    for dat_path in dat_paths:
+        directory = os.path.dirname(dat_path)
+        subdir = os.path.relpath(os.path.abspath(directory), root) if root else ''
+        name = os.path.splitext(os.path.basename(dat_path))[0]
+        txt_path = os.path.join(txt_dir, subdir, name + '.txt')
+        out_path = os.path.join(out_dir, subdir, os.path.basename(dat_path)) if out_dir else None
+        if action == 'convert' and not os.path.exists(txt_path):
+            batch.skipped.append(dat_path)
+            continue
+        target = out_path if action == 'convert' else txt_path
+        key = os.path.normcase(os.path.abspath(target))
+        if key in writers:
+            batch.error = f"Error: {writers[key]} and {dat_path} would both be written to {target}"
+            return []
+        writers[key] = dat_path
+        jobs.append((action, dat_path, bed_path or os.path.join(directory, 'languages.bed'), txt_path, out_path,
+                     shared_bed if shared_bed is not None else bed_by_dir[directory],
+                     languages_by_dir[directory], dedupe, incremental, index))
+    for job in jobs:
+        target = job[4] if action == 'convert' else job[3]
+        os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+    return jobs
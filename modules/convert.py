@@ -2,86 +2,160 @@
 Conversion logic for LangTool X modules.
 """
 
+import io
 import os
 import struct
 import logging
-from modules.utils import read_languages_from_ini, get_language_name, read_bed_file
-from modules.datfile import read_dat_header, write_dat_file_table, validate_dat_structure
-from modules.txtblock import parse_text_block
+from modules.utils import (read_languages_from_ini_cached, get_language_name, read_bed_file_cached,
+                           read_bed_warnings_cached, write_file_atomic)
+from modules.datfile import DatFile, read_dat_header, pack_dat_strings, validate_dat_structure
+from modules.txtblock import iter_text_blocks
+from modules.txtindex import (FLAG_INVALID, default_index_path, load_txt_index, save_txt_index,
+                              scan_txt_blocks, can_scan, parse_block)
+from modules.incremental import update_dat_incremental
+from modules.results import ConvertResult
 
-def convert_to_dat(txt_path, input_dat_path, output_dat_path, bed_path, mode='table'):
+logger = logging.getLogger('langtool')
+
+
+def convert_to_dat(txt_path, input_dat_path, output_dat_path, bed_path, mode='table', dedupe=False,
+                   bed_data=None, languages=None, incremental=False, manifest_path=None, index=False,
+                   index_path=None):
     """
     Converts .txt file back to .dat format.
-    Performs validation and outputs diagnostics.
+    With dedupe=True identical strings share one payload in the output .dat.
+    With incremental=True the previous output .dat and its hash manifest are
+    used to re-encode only changed strings (see update_dat_incremental).
+    With index=True the .txt sidecar index (default <txt>.idx) is used: blocks
+    unchanged since the last indexed convert are taken from the previous output
+    .dat instead of being parsed, and the index is refreshed afterwards.
+    bed_data ((string_ids, expected_blocks) from read_bed_file) and languages
+    (from read_languages_from_ini) can be passed in to skip re-parsing those files.
+    Performs validation and returns ConvertResult with diagnostics; nothing is printed.
+    """
+    result = ConvertResult(txt_path, input_dat_path, output_dat_path)
+    result.dedupe = dedupe
+    result.incremental = incremental
+    if index:
+        index_path = index_path or default_index_path(txt_path)
+    with result.span('total'):
+        try:
+            _convert(result, bed_path, bed_data, languages, manifest_path, index_path)
+        except Exception as e:
+            result.fail(f"Error converting file: {e}")
+    return result
+
+
+def _convert(result, bed_path, bed_data, languages, manifest_path, index_path):
+    """
+    Body of convert_to_dat; fills result and raises on I/O or format errors.
+    """
+    txt_path, input_dat_path, output_dat_path = result.txt_path, result.input_dat_path, result.output_dat_path
+    with result.span('read_ini'):
+        if languages is None:
+            ini_path = os.path.join(os.path.dirname(input_dat_path), 'version.ini')
+            languages = read_languages_from_ini_cached(ini_path)
+        result.language = get_language_name(input_dat_path, languages)
+    strings = []
+    txt_index = None
+    with result.span('parse_txt'):
+        if index_path:
+            txt_index = _parse_indexed(result, txt_path, output_dat_path, index_path, strings)
+        else:
+            with open(txt_path, 'r', encoding='utf-8') as f:
+                _collect_blocks(result, (text for _, text in iter_text_blocks(f)), strings)
+    result.count('bytes_read', os.path.getsize(txt_path))
+    result.count('strings_parsed', len(strings))
+    result.total_blocks = len(strings)
+    with open(input_dat_path, 'rb') as fdat:
+        header = fdat.read(4)
+        str_num = struct.unpack('<I', header)[0] & 0xFFFF
+        if len(strings) != str_num:
+            result.warn(f"WARNING: Number of blocks in .txt ({len(strings)}) and .dat ({str_num}) do not match!")
+    if bed_data is not None or os.path.exists(bed_path):
+        with result.span('read_bed'):
+            if bed_data is None:
+                bed_data = read_bed_file_cached(bed_path)
+                result.warnings.extend(read_bed_warnings_cached(bed_path))  # Already logged by read_bed_file
+            string_ids, expected_blocks = bed_data
+        if len(strings) != len(string_ids):
+            result.warn(f"WARNING: Number of blocks in .txt ({len(strings)}) and .bed ({len(string_ids)}) do not match!")
+    result.multiline_blocks = sum(1 for s in strings if '\n' in s)
+    result.single_blocks = len(strings) - result.multiline_blocks - result.empty_blocks - result.invalid_blocks
+    if result.incremental:
+        status, changed, result.saved_bytes = update_dat_incremental(
+            output_dat_path, strings, manifest_path, dedupe=result.dedupe, stats=result)
+        result.changed_strings = len(changed)
+    else:
+        data, result.saved_bytes = pack_dat_strings(strings, dedupe=result.dedupe, stats=result)
+        with result.span('write_dat'):
+            write_file_atomic(output_dat_path, data)
+        result.count('bytes_written', len(data))
+        status = 'full'
+    result.update_status = status
+    logger.info(f"Conversion: total={len(strings)}, empty={result.empty_blocks}, invalid={result.invalid_blocks}, multiline={result.multiline_blocks}, single={result.single_blocks}, saved={result.saved_bytes}, update={status}")
+    if txt_index is not None:
+        with result.span('write_index'):
+            stat = os.stat(output_dat_path)
+            txt_index.dat_size, txt_index.dat_mtime_ns = stat.st_size, stat.st_mtime_ns
+            save_txt_index(index_path, txt_index)
+    if status != 'unchanged':
+        result.validation = validate_dat_structure(output_dat_path, stats=result)
+    result.ok = True
+
+
+def _collect_blocks(result, texts, strings):
+    """
+    Append each block text to strings ('' for {INVALID} blocks, given as None),
+    counting empty and invalid blocks. Returns the positions of invalid blocks.
+    """
+    invalid = []
+    for text in texts:
+        if text is None:
+            invalid.append(len(strings))
+            strings.append('')
+            result.invalid_blocks += 1
+            continue
+        if not text:
+            result.empty_blocks += 1
+        strings.append(text)
+    return invalid
+
+
+def _parse_indexed(result, txt_path, output_dat_path, index_path, strings):
+    """
+    Fill strings from the .txt using its sidecar index. Blocks whose hash
+    matches the previous index are read from the .dat that index was built
+    into; only new or edited blocks are parsed.
+    Returns the refreshed TxtIndex, or None if the file cannot be indexed
+    byte-wise (it is then parsed as text).
     """
-    try:
-        ini_path = os.path.join(os.path.dirname(input_dat_path), 'version.ini')
-        languages = read_languages_from_ini(ini_path)
-        language = get_language_name(input_dat_path, languages)
-        print(f"\nProcessing files:")
-        print(f"- Input text: {txt_path}")
-        print(f"- Template DAT: {input_dat_path}{language}")
-        print(f"- Output DAT: {output_dat_path}")
-        blocks = []
-        current_block = []
-        with open(txt_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.rstrip('\r\n')
-                if line.startswith('[String ID:'):
-                    if current_block:
-                        blocks.append(current_block)
-                        current_block = []
-                current_block.append(line)
-            if current_block:
-                blocks.append(current_block)
-        print(f"\nText file info:")
-        print(f"- Found {len(blocks)} text blocks")
-        with open(input_dat_path, 'rb') as fdat:
-            header = fdat.read(4)
-            str_num = struct.unpack('<I', header)[0] & 0xFFFF
-            if len(blocks) != str_num:
-                msg = f"WARNING: Number of blocks in .txt ({len(blocks)}) and .dat ({str_num}) do not match!"
-                print(msg)
-                logging.warning(msg)
-        if os.path.exists(bed_path):
-            string_ids, expected_blocks = read_bed_file(bed_path)
-            if len(blocks) != len(string_ids):
-                msg = f"WARNING: Number of blocks in .txt ({len(blocks)}) and .bed ({len(string_ids)}) do not match!"
-                print(msg)
-                logging.warning(msg)
-        strings = []
-        empty_blocks = 0
-        invalid_blocks = 0
-        for block in blocks:
-            string_id, text_lines = parse_text_block(block)
-            if string_id is None:
-                continue
-            if text_lines is None:
-                strings.append('')
-                invalid_blocks += 1
-                continue
-            text = ''
-            for line, needs_break in text_lines:
-                text += line
-                if needs_break:
-                    text += '\n'
-            if not text:
-                empty_blocks += 1
-            strings.append(text)
-        multiline_blocks = sum(1 for s in strings if '\n' in s)
-        single_blocks = len(strings) - multiline_blocks - empty_blocks - invalid_blocks
-        print(f"\nConversion diagnostics:")
-        print(f"- Total blocks: {len(strings)}")
-        print(f"- Empty blocks: {empty_blocks}")
-        print(f"- Invalid blocks: {invalid_blocks}")
-        print(f"- Multiline blocks: {multiline_blocks}")
-        print(f"- Single line blocks: {single_blocks}")
-        logging.info(f"Conversion: total={len(strings)}, empty={empty_blocks}, invalid={invalid_blocks}, multiline={multiline_blocks}, single={single_blocks}")
-        if write_dat_file_table(output_dat_path, strings):
-            validate_dat_structure(output_dat_path)
-            return True
-        return False
-    except Exception as e:
-        print(f"Error converting file: {e}")
-        logging.error(f"Error converting file: {e}")
-        return False 
\ No newline at end of file
+    with open(txt_path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        data = f.read()
+    txt_index = scan_txt_blocks(data, stat.st_size, stat.st_mtime_ns) if can_scan(data) else None
+    previous = load_txt_index(index_path) if txt_index is not None else None
+    if previous is None or not previous.built_dat(output_dat_path):
+        blocks = iter_text_blocks(io.StringIO(data.decode('utf-8'), newline=None))
+        invalid = _collect_blocks(result, (text for _, text in blocks), strings)
+        if txt_index is None or len(strings) != len(txt_index):  # Do not trust a scan the parser disagrees with
+            return None
+        for position in invalid:
+            txt_index.flags[position] = FLAG_INVALID
+        return txt_index
+    texts = []
+    parsed = 0
+    with DatFile(output_dat_path) as dat:
+        old_strings = dat.decode_all()
+    for position, (offset, length, block_hash) in enumerate(
+            zip(txt_index.offsets, txt_index.lengths, txt_index.hashes)):
+        if position < len(old_strings) and previous.hashes[position] == block_hash:
+            texts.append(None if previous.flags[position] & FLAG_INVALID else old_strings[position])
+        else:
+            texts.append(parse_block(data[offset:offset + length])[1])
+            parsed += 1
+    for position in _collect_blocks(result, texts, strings):
+        txt_index.flags[position] = FLAG_INVALID
+    result.count('blocks_parsed', parsed)
+    result.count('blocks_reused', len(texts) - parsed)
+    return txt_index
@@ -4,7 +4,20 @@ DAT file operations for LangTool X modules.
 
 import struct
 import os
+import sys
+import mmap
+import heapq
+import hashlib
 import logging
+from array import array
+from itertools import accumulate
+from modules.utils import write_file_atomic
+from modules.profiling import NULL_STATS
+from modules.utf16 import decode_section, encode_strings, offsets_from_lengths
+
+COMPARE_CHUNK_SIZE = 1 << 20  # 1 MiB per slice when comparing mapped files
+
+logger = logging.getLogger('langtool')
 
 
 def read_dat_header(dat_file):
@@ -22,32 +35,375 @@ def read_dat_header(dat_file):
     return str_num, text_offset
 
 
+def _unpack_table(data):
+    """
+    Split raw offset table bytes into (positions, lengths) arrays of uint32.
+    """
+    table = array('I')
+    table.frombytes(data)
+    if sys.byteorder == 'big':
+        table.byteswap()
+    return table[0::2], table[1::2]
+
+
+class DatFile:
+    """
+    Memory-mapped .dat reader.
+    The offset table is unpacked in one pass on open; strings are decoded only
+    when accessed by index, slice or iteration.
+    """
+
+    def __init__(self, dat_path):
+        self.path = dat_path
+        self._file = open(dat_path, 'rb')
+        self._mmap = None
+        self._view = None
+        try:
+            self.file_size = os.fstat(self._file.fileno()).st_size
+            if self.file_size < 4:
+                raise Exception("Invalid .dat file: file too small")
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mmap)
+            self.str_num = struct.unpack_from('<I', self._view, 0)[0] & 0xFFFF
+            self.text_offset = self.str_num * 8 + 4
+            if self.text_offset > self.file_size:
+                raise Exception("Invalid .dat file: string table truncated")
+            self.positions, self.lengths = _unpack_table(self._mmap[4:self.text_offset])
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Release the memory map and close the underlying file.
+        """
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __len__(self):
+        return self.str_num
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._decode(i) for i in range(*index.indices(self.str_num))]
+        if index < 0:
+            index += self.str_num
+        if not 0 <= index < self.str_num:
+            raise IndexError("string index out of range")
+        return self._decode(index)
+
+    def __iter__(self):
+        data = self._mmap
+        for start, length in zip(self.positions, self.lengths):
+            yield data[start:start + length * 2].decode('utf-16le', 'replace')  # *2 for UTF-16
+
+    def decode_all(self):
+        """
+        Decode every string with a single decode of the text section, sliced by
+        offsets (see utf16.decode_section). Falls back to per-string decoding
+        for odd or out-of-section offsets and entries splitting a surrogate pair.
+        """
+        strings = decode_section(self._mmap[self.text_offset:], self.text_offset, self.positions, self.lengths)
+        return list(self) if strings is None else strings
+
+    def payload(self, index):
+        """
+        Return the raw UTF-16LE bytes of string `index` without decoding them.
+        """
+        start = self.positions[index]
+        return self._mmap[start:start + self.lengths[index] * 2]
+
+    def identical_to(self, other):
+        """
+        Check whether other (a DatFile) has exactly the same bytes.
+        Compared slice by slice, so neither file is copied whole and the first
+        difference ends the check.
+        """
+        if self.file_size != other.file_size:
+            return False
+        mine, theirs = self._mmap, other._mmap
+        return all(mine[start:start + COMPARE_CHUNK_SIZE] == theirs[start:start + COMPARE_CHUNK_SIZE]
+                   for start in range(0, self.file_size, COMPARE_CHUNK_SIZE))
+
+    def has_separator(self, index):
+        """
+        Check that string `index` is followed by the 2-byte null separator.
+        """
+        end = self.positions[index] + self.lengths[index] * 2
+        return self._mmap[end:end + 2] == b'\x00\x00'
+
+    def file_digest(self, digest_size=16):
+        """
+        BLAKE2b hex digest of the whole file, hashed straight from the memory map.
+        """
+        return hashlib.blake2b(self._view, digest_size=digest_size).hexdigest()
+
+    def string_digests(self, digest_size=8):
+        """
+        BLAKE2b hex digest of every string payload in ID order, hashed from the
+        memory map without copying. Out-of-bounds entries hash what is present.
+        """
+        view = self._view
+        empty = hashlib.blake2b(digest_size=digest_size)  # Copying is cheaper than a new hash per string
+        digests = []
+        for start, length in zip(self.positions, self.lengths):
+            digest = empty.copy()
+            digest.update(view[start:start + length * 2])
+            digests.append(digest.hexdigest())
+        return digests
+
+    def _decode(self, index):
+        start = self.positions[index]
+        return self._mmap[start:start + self.lengths[index] * 2].decode('utf-16le', 'replace')  # *2 for UTF-16
+
+
+class StringEntry:
+    """
+    View of one StringTable entry; nothing is copied or decoded until asked.
+    """
+
+    __slots__ = ('table', 'index')
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    @property
+    def position(self):
+        return self.table.positions[self.index]
+
+    @property
+    def length(self):
+        return self.table.lengths[self.index]
+
+    @property
+    def payload(self):
+        return self.table.payload(self.index)
+
+    @property
+    def text(self):
+        return self.table[self.index]
+
+
+class StringTable:
+    """
+    Compact in-memory string table.
+    Positions and lengths are kept in array('I') and the text section as a
+    single bytes blob, so an entry costs 8 bytes plus its UTF-16 payload
+    instead of a Python str. Strings are decoded only when accessed.
+    Positions are .dat file offsets: a table can be validated, compared and
+    written back exactly like the file it was read from.
+    """
+
+    __slots__ = ('positions', 'lengths', 'text', 'text_offset', '_base')
+
+    def __init__(self, positions, lengths, text, base=None):
+        self.positions = positions
+        self.lengths = lengths
+        self.text = text  # File bytes from offset _base to the end
+        self.text_offset = len(positions) * 8 + 4
+        self._base = self.text_offset if base is None else base
+
+    @classmethod
+    def from_file(cls, dat_path):
+        """
+        Read a .dat file into a table. Raises on truncated or invalid files.
+        """
+        with open(dat_path, 'rb') as f:
+            header = f.read(4)
+            if len(header) < 4:
+                raise Exception("Invalid .dat file: file too small")
+            str_num = struct.unpack('<I', header)[0] & 0xFFFF
+            data = f.read(str_num * 8)
+            if len(data) < str_num * 8:
+                raise Exception("Invalid .dat file: string table truncated")
+            positions, lengths = _unpack_table(data)
+            file_size = os.fstat(f.fileno()).st_size
+            text_offset = str_num * 8 + 4
+            if min(positions, default=text_offset) >= text_offset:
+                return cls(positions, lengths, f.read(file_size - text_offset))
+            f.seek(0)  # Entries pointing into the header: keep the whole file
+            return cls(positions, lengths, f.read(file_size), base=0)
+
+    @classmethod
+    def from_strings(cls, strings, dedupe=False):
+        """
+        Build a table from str objects, laid out as from_payloads would lay
+        out their encodings. All strings are encoded in one call.
+        """
+        unique = list(dict.fromkeys(strings)) if dedupe else strings
+        text, lengths = encode_strings(unique)
+        positions = offsets_from_lengths(lengths, len(strings) * 8 + 4)
+        if dedupe:
+            slots = {value: i for i, value in enumerate(unique)}
+            indices = [slots[value] for value in strings]
+            positions = array('I', [positions[i] for i in indices])
+            lengths = array('I', [lengths[i] for i in indices])
+        return cls(positions, lengths, text)
+
+    @classmethod
+    def from_payloads(cls, encoded, dedupe=False):
+        """
+        Build a table from UTF-16LE payloads. With dedupe=True identical
+        payloads are stored once and their entries share a position.
+        """
+        str_num = len(encoded)
+        payloads = encoded
+        if dedupe:
+            slots = {}
+            payloads = []
+            for data in encoded:
+                if data not in slots:
+                    slots[data] = len(payloads)
+                    payloads.append(data)
+        sizes = [len(data) + 2 for data in payloads]  # +2 for separator
+        payload_positions = array('I', accumulate([str_num * 8 + 4] + sizes))[:-1]
+        if dedupe:
+            positions = array('I', [payload_positions[slots[data]] for data in encoded])
+        else:
+            positions = payload_positions
+        lengths = array('I', [len(data) >> 1 for data in encoded])
+        separator = b'\x00\x00'
+        text = separator.join(payloads) + separator if payloads else b''
+        return cls(positions, lengths, text)
+
+    @property
+    def str_num(self):
+        return len(self.positions)
+
+    @property
+    def file_size(self):
+        return self._base + len(self.text)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._decode(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("string index out of range")
+        return self._decode(index)
+
+    def __iter__(self):
+        return map(self._decode, range(len(self)))
+
+    def entry(self, index):
+        """
+        Return a StringEntry view of entry index.
+        """
+        if not 0 <= index < len(self):
+            raise IndexError("string index out of range")
+        return StringEntry(self, index)
+
+    def decode_all(self):
+        """
+        Decode every string at once; see DatFile.decode_all.
+        """
+        strings = decode_section(self.text[self.text_offset - self._base:], self.text_offset,
+                                 self.positions, self.lengths)
+        return list(self) if strings is None else strings
+
+    def payload(self, index):
+        """
+        Return the raw UTF-16LE bytes of string `index` without decoding them.
+        """
+        start = self.positions[index] - self._base
+        return self.text[start:start + self.lengths[index] * 2]
+
+    def has_separator(self, index):
+        """
+        Check that string `index` is followed by the 2-byte null separator.
+        """
+        end = self.positions[index] + self.lengths[index] * 2 - self._base
+        return self.text[end:end + 2] == b'\x00\x00'
+
+    def identical_to(self, other):
+        """
+        Check whether other (a StringTable) holds exactly the same bytes.
+        """
+        if self._base != other._base:
+            return self.to_bytes() == other.to_bytes()
+        return self.positions == other.positions and self.lengths == other.lengths and self.text == other.text
+
+    def to_bytes(self):
+        """
+        Return the complete contents of the .dat file.
+        """
+        header = struct.pack('<HH', len(self), 0)  # Number of strings (2 bytes) + null word (2 bytes)
+        table = array('I', [0]) * (len(self) * 2)
+        table[0::2] = self.positions
+        table[1::2] = self.lengths
+        if sys.byteorder == 'big':
+            table.byteswap()
+        return b''.join((header, table, self.text[self.text_offset - self._base:]))
+
+    def _decode(self, index):
+        start = self.positions[index] - self._base
+        return self.text[start:start + self.lengths[index] * 2].decode('utf-16le', 'replace')  # *2 for UTF-16
+
+
+def read_dat_string(dat_path, index):
+    """
+    Read a single string by index without loading the file: the header, one
+    table entry and that string's payload are read, whatever the file size.
+    Raises IndexError if index is out of range.
+    """
+    with open(dat_path, 'rb', buffering=0) as f:
+        header = f.read(4)
+        if len(header) < 4:
+            raise Exception("Invalid .dat file: file too small")
+        str_num = struct.unpack('<I', header)[0] & 0xFFFF
+        if not 0 <= index < str_num:
+            raise IndexError(f"String ID {index} out of range (0-{str_num - 1})")
+        f.seek(4 + index * 8)
+        entry = f.read(8)
+        if len(entry) < 8:
+            raise Exception("Invalid .dat file: string table truncated")
+        pos, length = struct.unpack('<II', entry)
+        f.seek(pos)
+        data = f.read(length * 2)
+        if len(data) != length * 2:
+            raise Exception(f"Invalid .dat file: string {index} out of bounds")
+        return data.decode('utf-16le', 'replace')
+
+
 def read_dat_file_table(dat_path):
     """
     Read .dat file using string offset table method.
     Returns (number of strings, list of strings).
     """
     try:
-        with open(dat_path, 'rb') as f:
-            header = f.read(4)
-            str_num = struct.unpack('<I', header)[0] & 0xFFFF
-            strings = []
-            for _ in range(str_num):
-                str_pos = struct.unpack('<I', f.read(4))[0]
-                str_len = struct.unpack('<I', f.read(4))[0]
-                last_pos = f.tell()
-                f.seek(str_pos)
-                str_data = f.read(str_len * 2)  # *2 for UTF-16
-                text = str_data.decode('utf-16le', errors='replace')
-                strings.append(text)
-                f.seek(last_pos)
-            return str_num, strings
+        with DatFile(dat_path) as dat:
+            return dat.str_num, dat.decode_all()
     except Exception as e:
-        print(f"Error reading .dat file: {e}")
-        logging.error(f"Error reading .dat file: {e}")
+        logger.error(f"Error reading .dat file: {e}")
         return 0, []
 
 
+def read_string_table(dat_path):
+    """
+    Read a .dat file into a StringTable: one read of the file, no decoding.
+    Raises on I/O errors and invalid files.
+    """
+    return StringTable.from_file(dat_path)
+
+
 def write_dat_file_table(output_path, strings):
     """
     Write .dat file using string offset table method.
@@ -73,41 +429,165 @@ def write_dat_file_table(output_path, strings):
                 f.write(struct.pack('<H', 0))  # Separator (2 bytes)
             return True
     except Exception as e:
-        print(f"Error writing .dat file: {e}")
-        logging.error(f"Error writing .dat file: {e}")
+        logger.error(f"Error writing .dat file: {e}")
+        return False
+
+
+def pack_dat_strings(strings, dedupe=False, stats=NULL_STATS):
+    """
+    Build the complete contents of a .dat file in one buffer.
+    All strings are encoded in one call and the offset table is packed in bulk.
+    Lengths are stored in UTF-16 code units, so non-BMP characters count twice.
+    With dedupe=True identical strings share a single payload in the text section.
+    Stages are timed into stats ('encode', 'pack') when a collector is given.
+    Returns (file contents, bytes saved by deduplication).
+    """
+    with stats.span('encode'):
+        table = StringTable.from_strings(strings, dedupe=dedupe)
+    stats.count('strings_encoded', len(strings))
+    with stats.span('pack'):
+        data = table.to_bytes()
+    saved_bytes = (sum(table.lengths) + len(strings)) * 2 - len(table.text) if dedupe else 0
+    return data, saved_bytes
+
+
+def pack_dat_payloads(encoded, dedupe=False, stats=NULL_STATS):
+    """
+    Same as pack_dat_strings, for strings already encoded as UTF-16LE bytes.
+    """
+    with stats.span('pack'):
+        return _pack_payloads(encoded, dedupe)
+
+
+def _pack_payloads(encoded, dedupe):
+    table = StringTable.from_payloads(encoded, dedupe=dedupe)
+    saved_bytes = sum(map(len, encoded)) + len(encoded) * 2 - len(table.text) if dedupe else 0
+    return table.to_bytes(), saved_bytes
+
+
+def write_dat_file_buffered(output_path, strings, dedupe=False):
+    """
+    Write .dat file from a single pre-assembled buffer.
+    The file is written to a temporary path and renamed over output_path,
+    so readers never see a partially written file.
+    Returns True on success, False on error.
+    """
+    try:
+        data, _ = pack_dat_strings(strings, dedupe=dedupe)
+        write_file_atomic(output_path, data)
+        return True
+    except Exception as e:
+        logger.error(f"Error writing .dat file: {e}")
         return False
 
 
-def validate_dat_structure(dat_path):
+class DatValidationReport:
+    """
+    Result of a .dat structure check.
+    Out-of-bounds entries, overlaps and missing separators make the file invalid;
+    gaps (unused bytes in the text section) are reported but tolerated.
+    """
+
+    def __init__(self, str_num, file_size, text_offset):
+        self.str_num = str_num
+        self.file_size = file_size
+        self.text_offset = text_offset
+        self.out_of_bounds = []       # (index, pos, length)
+        self.overlaps = []            # (index, other_index)
+        self.missing_separators = []  # index
+        self.gaps = []                # (start, end) byte ranges
+        self.shared = 0               # entries pointing at another entry's payload
+
+    @property
+    def ok(self):
+        return not (self.out_of_bounds or self.overlaps or self.missing_separators)
+
+    def messages(self):
+        """
+        Return human-readable warning lines for every issue found.
+        """
+        return self.error_messages() + self.gap_messages()
+
+    def error_messages(self):
+        """
+        Return warning lines for the issues that make the file invalid.
+        """
+        lines = []
+        for idx, pos, length in self.out_of_bounds:
+            lines.append(f"WARNING: String {idx} position/length out of bounds: pos={pos}, len={length}")
+        for idx, other_idx in self.overlaps:
+            lines.append(f"WARNING: Overlap between string {idx} and {other_idx}")
+        for idx in self.missing_separators:
+            lines.append(f"WARNING: String {idx} is not followed by a null separator")
+        return lines
+
+    def gap_messages(self):
+        """
+        Return warning lines for unused bytes in the text section.
+        """
+        return [f"WARNING: {end - start} unused bytes at 0x{start:X}" for start, end in self.gaps]
+
+
+def check_dat_structure(dat):
     """
-    Validate .dat file structure: check offsets and lengths for overlaps and bounds.
+    Check an open DatFile or a StringTable for out-of-bounds entries, overlaps, gaps and missing separators.
+    Entries are sorted by position once and swept in order, keeping a min-heap of
+    the ends of strings still open, so every overlapping pair is reported at a
+    cost of O(n log n + k) for k overlaps.
+    Entries with identical position and length (deduplicated strings) are not overlaps.
+    Returns DatValidationReport.
+    """
+    report = DatValidationReport(dat.str_num, dat.file_size, dat.text_offset)
+    entries = sorted(zip(dat.positions, dat.lengths, range(dat.str_num)))
+    open_ends = []                 # Heap of (end, index, indices sharing the range) of strings still open
+    next_free = dat.text_offset    # First byte after the last string and its separator
+    prev_range = None
+    group = None                   # Heap item of the range seen last
+    for pos, length, idx in entries:
+        end = pos + length * 2  # *2 for UTF-16
+        if pos < dat.text_offset or end > dat.file_size:
+            report.out_of_bounds.append((idx, pos, length))
+            continue
+        if (pos, length) == prev_range:
+            report.shared += 1
+            if length:  # A copy overlaps whatever its first occurrence overlaps, but not it
+                report.overlaps.extend((other_idx, idx) for item in open_ends if item is not group
+                                       for other_idx in item[2])
+                group[2].append(idx)
+            continue
+        prev_range = (pos, length)
+        if length:
+            while open_ends and open_ends[0][0] <= pos:
+                heapq.heappop(open_ends)
+            group = (end, idx, [idx])
+            if open_ends:
+                # Every string still open reaches past pos, so each one overlaps this one
+                report.overlaps.extend((other_idx, idx) for item in open_ends for other_idx in item[2])
+                heapq.heappush(open_ends, group)
+            else:
+                open_ends.append(group)
+        if pos > next_free:
+            report.gaps.append((next_free, pos))
+        next_free = max(next_free, end + 2)  # +2 for separator
+        if not dat.has_separator(idx):
+            report.missing_separators.append(idx)
+    if next_free < dat.file_size:
+        report.gaps.append((next_free, dat.file_size))
+    return report
+
+
+def validate_dat_structure(dat_path, stats=NULL_STATS):
+    """
+    Validate .dat file structure: check offsets and lengths for overlaps, bounds,
+    gaps and separators. Logs warnings and returns DatValidationReport (None on error).
+    The check is timed into stats as 'validate' when a collector is given.
     """
     try:
-        with open(dat_path, 'rb') as f:
-            header = f.read(4)
-            str_num = struct.unpack('<I', header)[0] & 0xFFFF
-            entries = []
-            for _ in range(str_num):
-                str_pos = struct.unpack('<I', f.read(4))[0]
-                str_len = struct.unpack('<I', f.read(4))[0]
-                entries.append((str_pos, str_len))
-            file_size = os.path.getsize(dat_path)
-            text_offset = str_num * 8 + 4
-            for idx, (pos, length) in enumerate(entries):
-                if pos < text_offset or pos + length * 2 > file_size:
-                    msg = f"WARNING: String {idx} position/length out of bounds: pos={pos}, len={length}"
-                    print(msg)
-                    logging.warning(msg)
-            for idx, (pos, length) in enumerate(entries):
-                rng = (pos, pos + length * 2)
-                for other_idx, (op, ol) in enumerate(entries):
-                    if idx != other_idx:
-                        orng = (op, op + ol * 2)
-                        if max(rng[0], orng[0]) < min(rng[1], orng[1]):
-                            msg = f"WARNING: Overlap between string {idx} and {other_idx}"
-                            print(msg)
-                            logging.warning(msg)
+        with stats.span('validate'), DatFile(dat_path) as dat:
+            report = check_dat_structure(dat)
+        for msg in report.messages():
+            logger.warning(msg)
+        return report
     except Exception as e:
-        msg = f"Error validating .dat structure: {e}"
-        print(msg)
-        logging.error(msg) 
\ No newline at end of file
+        logger.error(f"Error validating .dat structure: {e}")
+        return None
@@ -0,0 +1,180 @@
+"""
+Structural comparison of .dat and .txt files for LangTool X modules.
+"""
+
+import os
+import logging
+from modules.utils import read_bed_file_cached
+from modules.datfile import DatFile
+from modules.results import DiffResult, DiffEntry
+
+logger = logging.getLogger('langtool')
+
+
+def diff_dat_files(old_path, new_path, bed_path=None, include_text=True):
+    """
+    Compare two .dat files string by string. Entries are compared as raw
+    UTF-16 payload bytes; only changed strings are decoded (and only if
+    include_text is set). Strings past the end of the shorter file are
+    reported as added or removed. Names come from bed_path when given.
+    Returns DiffResult; nothing is printed.
+    """
+    result = DiffResult(old_path, new_path)
+    with result.span('total'):
+        try:
+            names = _read_names(result, bed_path)
+            with DatFile(old_path) as old, DatFile(new_path) as new:
+                _diff(result, old, new, names, include_text)
+                result.count('bytes_read', old.file_size + new.file_size)
+        except Exception as e:
+            result.fail(f"Error comparing files: {e}")
+    return result
+
+
+def diff_tables(old, new, old_path=None, new_path=None, bed_path=None, include_text=True):
+    """
+    Same as diff_dat_files for tables already in memory: old and new are
+    StringTable (or open DatFile) objects; the paths are only reported.
+    """
+    result = DiffResult(old_path, new_path)
+    with result.span('total'):
+        try:
+            _diff(result, old, new, _read_names(result, bed_path), include_text)
+        except Exception as e:
+            result.fail(f"Error comparing files: {e}")
+    return result
+
+
+def diff_txt_files(old_path, new_path, bed_path=None, include_text=True):
+    """
+    Compare two .txt files block by block through their sidecar indexes
+    (built and saved if missing or stale). Blocks are matched by string ID
+    (the first block of a repeated ID counts, as for lookups) and compared by
+    the hashes in the index; only blocks whose hashes differ are read and
+    parsed, and they count as modified only if their text differs. Files
+    that cannot be indexed (bare \r line breaks) are parsed whole instead.
+    Returns DiffResult; nothing is printed.
+    """
+    from modules.txtindex import get_txt_index, read_txt_blocks  # Kept out of the startup path of .dat diffs
+    result = DiffResult(old_path, new_path)
+    with result.span('total'):
+        try:
+            names = _read_names(result, bed_path)
+            with result.span('read_index'):
+                old_index, new_index = get_txt_index(old_path), get_txt_index(new_path)
+            if old_index is None or new_index is None:  # Bare \r line breaks: compare parsed blocks
+                with result.span('parse_txt'):
+                    old_blocks, new_blocks = read_txt_blocks(old_path), read_txt_blocks(new_path)
+                _diff_parsed(result, old_blocks, new_blocks, names, include_text)
+            else:
+                _diff_indexed(result, old_index, new_index, names, include_text)
+        except Exception as e:
+            result.fail(f"Error comparing files: {e}")
+    return result
+
+
+def _read_names(result, bed_path):
+    if bed_path and os.path.exists(bed_path):
+        with result.span('read_bed'):
+            return read_bed_file_cached(bed_path)[0]
+    return {}
+
+
+def _diff(result, old, new, names, include_text):
+    """
+    Body of diff_dat_files; fills result and raises on format errors.
+    """
+
+    def entry(string_id, in_old, in_new):
+        old_text = old[string_id] if include_text and in_old else None
+        new_text = new[string_id] if include_text and in_new else None
+        return DiffEntry(string_id, names.get(string_id), old_text, new_text)
+
+    result.old_count, result.new_count = len(old), len(new)
+    common = min(len(old), len(new))
+    with result.span('compare'):
+        if type(old) is type(new) and old.identical_to(new):
+            changed = []
+        else:
+            old_payload, new_payload = old.payload, new.payload
+            changed = [i for i in range(common) if old_payload(i) != new_payload(i)]
+    result.unchanged = common - len(changed)
+    with result.span('decode'):
+        result.modified = [entry(i, True, True) for i in changed]
+        result.removed = [entry(i, True, False) for i in range(common, len(old))]
+        result.added = [entry(i, False, True) for i in range(common, len(new))]
+    result.count('strings_compared', common)
+    logger.info(f"Diff: modified={len(result.modified)}, added={len(result.added)}, removed={len(result.removed)}, unchanged={result.unchanged}")
+    result.ok = True
+
+
+def _diff_indexed(result, old_index, new_index, names, include_text):
+    """
+    Body of diff_txt_files; fills result and raises on read or parse errors.
+    """
+    from modules.txtindex import parse_block
+    old_blocks = _first_blocks(old_index)
+    new_blocks = _first_blocks(new_index)
+    result.old_count, result.new_count = len(old_blocks), len(new_blocks)
+    with result.span('compare'):
+        common = sorted(old_blocks.keys() & new_blocks.keys())
+        candidates = [string_id for string_id in common
+                      if old_index.hashes[old_blocks[string_id]] != new_index.hashes[new_blocks[string_id]]]
+    with result.span('decode'), open(result.old_path, 'rb') as old_file, open(result.new_path, 'rb') as new_file:
+
+        def text(f, index, position):
+            f.seek(index.offsets[position])
+            data = f.read(index.lengths[position])
+            result.count('bytes_read', len(data))
+            return parse_block(data)[1]
+
+        def entry(string_id, old_text=None, new_text=None):
+            return DiffEntry(string_id, names.get(string_id), old_text, new_text)
+
+        for string_id in candidates:  # Blocks may hash differently only by their line endings
+            old_text = text(old_file, old_index, old_blocks[string_id])
+            new_text = text(new_file, new_index, new_blocks[string_id])
+            if old_text != new_text:
+                result.modified.append(entry(string_id, old_text, new_text) if include_text else entry(string_id))
+        result.removed = [entry(string_id, text(old_file, old_index, old_blocks[string_id]) if include_text else None)
+                          for string_id in sorted(old_blocks.keys() - new_blocks.keys())]
+        result.added = [entry(string_id, None, text(new_file, new_index, new_blocks[string_id]) if include_text else None)
+                        for string_id in sorted(new_blocks.keys() - old_blocks.keys())]
+    result.unchanged = len(common) - len(result.modified)
+    result.count('strings_compared', len(common))
+    logger.info(f"Diff: modified={len(result.modified)}, added={len(result.added)}, removed={len(result.removed)}, unchanged={result.unchanged}")
+    result.ok = True
+
+
+def _diff_parsed(result, old_blocks, new_blocks, names, include_text):
+    """
+    diff_txt_files for files parsed whole: {string_id: text} on each side.
+    """
+
+    def entry(string_id, old_text=None, new_text=None):
+        return DiffEntry(string_id, names.get(string_id), old_text, new_text)
+
+    result.old_count, result.new_count = len(old_blocks), len(new_blocks)
+    with result.span('compare'):
+        common = sorted(old_blocks.keys() & new_blocks.keys())
+        result.modified = [entry(string_id, old_blocks[string_id], new_blocks[string_id]) if include_text
+                           else entry(string_id)
+                           for string_id in common if old_blocks[string_id] != new_blocks[string_id]]
+        result.removed = [entry(string_id, old_blocks[string_id] if include_text else None)
+                          for string_id in sorted(old_blocks.keys() - new_blocks.keys())]
+        result.added = [entry(string_id, None, new_blocks[string_id] if include_text else None)
+                        for string_id in sorted(new_blocks.keys() - old_blocks.keys())]
+    result.unchanged = len(common) - len(result.modified)
+    result.count('strings_compared', len(common))
+    logger.info(f"Diff: modified={len(result.modified)}, added={len(result.added)}, removed={len(result.removed)}, unchanged={result.unchanged}")
+    result.ok = True
+
+
+def _first_blocks(index):
+    """
+    Map each string ID of a TxtIndex to the position of its first block.
+    """
+    blocks = {}
+    for position, string_id in enumerate(index.ids):
+        blocks.setdefault(string_id, position)
+    return blocks
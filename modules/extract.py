@@ -4,106 +4,111 @@ Extraction logic for LangTool X modules.
 
 import os
 import logging
-from modules.utils import read_languages_from_ini, get_language_name, read_bed_file
-from modules.datfile import read_dat_file_table
+from contextlib import ExitStack
+from itertools import islice, zip_longest
+from modules.utils import (read_languages_from_ini_cached, get_language_name, read_bed_file_cached,
+                           read_bed_warnings_cached, WRITE_BUFFER_SIZE)
+from modules.datfile import DatFile
+from modules.txtblock import format_text_block
+from modules.txtindex import default_index_path, build_txt_index, save_txt_index
+from modules.results import ExtractResult
 
-def extract_strings(dat_path, bed_path, output_path, mode='table', original_dat_path=None):
+logger = logging.getLogger('langtool')
+
+
+def extract_strings(dat_path, bed_path, output_path, mode='table', original_dat_path=None,
+                    bed_data=None, languages=None, index=False, index_path=None):
     """
     Extracts strings from .dat file and saves them to .txt.
     If original_dat_path is provided, also outputs original strings as //...// before translation.
-    Performs validation and outputs diagnostics.
+    bed_data ((string_ids, expected_blocks) from read_bed_file) and languages
+    (from read_languages_from_ini) can be passed in to skip re-parsing those files.
+    With index=True a sidecar block index is written next to the .txt (default <txt>.idx).
+    Performs validation and returns ExtractResult with diagnostics; nothing is printed.
+    """
+    result = ExtractResult(dat_path, bed_path, output_path, original_dat_path)
+    if index:
+        index_path = index_path or default_index_path(output_path)
+    with result.span('total'):
+        try:
+            _extract(result, bed_data, languages, index_path)
+        except Exception as e:
+            result.fail(f"Error processing file: {e}")
+    return result
+
+
+def _extract(result, bed_data, languages, index_path):
+    """
+    Body of extract_strings; fills result and raises on I/O or format errors.
     """
-    try:
-        ini_path = os.path.join(os.path.dirname(dat_path), 'version.ini')
-        languages = read_languages_from_ini(ini_path)
-        language = get_language_name(dat_path, languages)
-        print(f"\nProcessing files:")
-        print(f"- DAT file: {dat_path}{language}")
-        print(f"- BED file: {bed_path}")
-        print(f"- Output: {output_path}")
+    dat_path, original_dat_path = result.dat_path, result.original_dat_path
+    with result.span('read_ini'):
+        if languages is None:
+            ini_path = os.path.join(os.path.dirname(dat_path), 'version.ini')
+            languages = read_languages_from_ini_cached(ini_path)
+        result.language = get_language_name(dat_path, languages)
         if original_dat_path:
             original_ini_path = os.path.join(os.path.dirname(original_dat_path), 'version.ini')
-            original_languages = read_languages_from_ini(original_ini_path)
-            original_language = get_language_name(original_dat_path, original_languages)
-            print(f"- Original DAT: {original_dat_path}{original_language}")
-        string_ids, expected_blocks = read_bed_file(bed_path)
-        print(f"\nBED file info:")
-        print(f"- Found {len(string_ids)} string IDs")
-        print(f"- Expected blocks: {expected_blocks}")
-        str_num, strings = read_dat_file_table(dat_path)
-        original_strings = None
-        if original_dat_path:
-            orig_num, orig_strings = read_dat_file_table(original_dat_path)
+            original_languages = read_languages_from_ini_cached(original_ini_path)
+            result.original_language = get_language_name(original_dat_path, original_languages)
+    with result.span('read_bed'):
+        if bed_data is None:
+            bed_data = read_bed_file_cached(result.bed_path)
+            result.warnings.extend(read_bed_warnings_cached(result.bed_path))  # Already logged by read_bed_file
+        string_ids, result.expected_blocks = bed_data
+    result.bed_ids = len(string_ids)
+    with ExitStack() as stack:
+        with result.span('open_dat'):
+            strings = stack.enter_context(DatFile(dat_path))
+            original_strings = stack.enter_context(DatFile(original_dat_path)) if original_dat_path else None
+        str_num = result.str_num = len(strings)
+        result.count('bytes_read', strings.file_size)
+        if original_strings is not None:
+            orig_num = len(original_strings)
+            result.count('bytes_read', original_strings.file_size)
             if orig_num != str_num:
-                print(f"WARNING: Number of strings in original DAT ({orig_num}) and current DAT ({str_num}) do not match!")
-            original_strings = orig_strings
+                result.warn(f"WARNING: Number of strings in original DAT ({orig_num}) and current DAT ({str_num}) do not match!")
         if len(string_ids) != str_num:
-            msg = f"WARNING: Number of strings in .dat ({str_num}) and .bed ({len(string_ids)}) do not match!"
-            print(msg)
-            logging.warning(msg)
-        file_size = os.path.getsize(dat_path)
+            result.warn(f"WARNING: Number of strings in .dat ({str_num}) and .bed ({len(string_ids)}) do not match!")
+        result.file_size = strings.file_size
+        result.text_offset = strings.text_offset
         if str_num == 0:
-            msg = "ERROR: No strings found in .dat file."
-            print(msg)
-            logging.error(msg)
-            return False
-        text_offset = str_num * 8 + 4
-        print(f"\nDAT file structure:")
-        print(f"- Number of strings: {str_num}")
-        print(f"- Text section offset: 0x{text_offset:X}")
-        print(f"- Header size: {text_offset} bytes")
-        print(f"- Total file size: {file_size} bytes")
-        print(f"- Text section size: {file_size - text_offset} bytes")
-        empty_blocks = 0
-        invalid_blocks = 0
-        multiline_blocks = 0
-        single_blocks = 0
-        with open(output_path, 'w', encoding='utf-8') as out:
-            for string_id, text in enumerate(strings):
-                string_name = string_ids.get(string_id, f"String_{string_id}")
-                if '\n' in text:
-                    out.write(f"[String ID: {string_id}] [{string_name}] [Do not remove {{LF}} tags]\n")
-                    multiline_blocks += 1
-                else:
-                    out.write(f"[String ID: {string_id}] [{string_name}]\n")
-                    single_blocks += 1
-                # Output original string if present
-                if original_strings and string_id < len(original_strings):
-                    orig_text = original_strings[string_id]
-                    if orig_text == '':
-                        out.write('//{EMPTY}//\n')
-                    elif orig_text == '{INVALID}':
-                        out.write('//{INVALID}//\n')
-                    else:
-                        # Convert multiline text to multiple lines with {LF} tags
-                        orig_lines = orig_text.split('\n')
-                        out.write('//')
-                        for i, line in enumerate(orig_lines):
-                            out.write(line)
-                            if i < len(orig_lines) - 1:
-                                out.write('{LF}\n')
-                        out.write('//\n')
-                if text:
-                    lines = text.split('\n')
-                    for i, line in enumerate(lines):
-                        out.write(line)
-                        if i < len(lines) - 1:
-                            out.write('{LF}\n')
-                        elif i == len(lines) - 1 and line:
-                            out.write('\n')
-                else:
-                    out.write('{EMPTY}\n')
-                    empty_blocks += 1
-                out.write('\n')
-        print(f"\nExtraction complete:")
-        print(f"- Total blocks: {str_num}")
-        print(f"- Empty blocks: {empty_blocks}")
-        print(f"- Invalid blocks: {invalid_blocks}")
-        print(f"- Multiline blocks: {multiline_blocks}")
-        print(f"- Single line blocks: {single_blocks}")
-        logging.info(f"Extraction: total={str_num}, empty={empty_blocks}, invalid={invalid_blocks}, multiline={multiline_blocks}, single={single_blocks}")
-        return True
-    except Exception as e:
-        print(f"Error processing file: {e}")
-        logging.error(f"Error processing file: {e}")
-        return False 
\ No newline at end of file
+            result.fail("ERROR: No strings found in .dat file.")
+            return
+        stats = {'empty': 0, 'multiline': 0}
+        with result.span('decode'):  # One decode per file instead of one per string
+            texts = strings.decode_all()
+            original_texts = original_strings.decode_all() if original_strings is not None else None
+        with result.span('write_txt'):
+            with open(result.output_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as out:
+                out.writelines(_render_blocks(texts, original_texts, string_ids, stats))
+        result.count('bytes_written', os.path.getsize(result.output_path))
+        if index_path:
+            with result.span('write_index'):
+                txt_index = build_txt_index(result.output_path)
+                if txt_index is not None:  # Strings with bare \r line breaks cannot be indexed
+                    save_txt_index(index_path, txt_index)
+        result.count('strings_decoded', str_num)
+        if original_strings is not None:
+            result.count('strings_decoded', min(orig_num, str_num))
+    result.total_blocks = str_num
+    result.empty_blocks = stats['empty']
+    result.multiline_blocks = stats['multiline']
+    result.single_blocks = str_num - result.multiline_blocks
+    logger.info(f"Extraction: total={str_num}, empty={result.empty_blocks}, invalid={result.invalid_blocks}, multiline={result.multiline_blocks}, single={result.single_blocks}")
+    result.ok = True
+
+
+def _render_blocks(strings, original_strings, string_ids, stats):
+    """
+    Yield each string rendered as a complete .txt block.
+    Counts empty and multiline strings into stats as a side effect.
+    """
+    originals = islice(original_strings, len(strings)) if original_strings else ()
+    for string_id, (text, original_text) in enumerate(zip_longest(strings, originals)):
+        if not text:
+            stats['empty'] += 1
+        elif '\n' in text:
+            stats['multiline'] += 1
+        string_name = string_ids.get(string_id, f"String_{string_id}")
+        yield format_text_block(string_id, string_name, text, original_text)
@@ -0,0 +1,140 @@
+"""
+Incremental .dat rebuilds for LangTool X modules.
+"""
+
+import os
+import json
+import hashlib
+from modules.utils import write_file_atomic
+from modules.datfile import DatFile, pack_dat_payloads
+from modules.profiling import NULL_STATS
+
+MANIFEST_VERSION = 1
+
+
+def default_manifest_path(dat_path):
+    """
+    Manifest path used when none is given: next to the output .dat.
+    """
+    return dat_path + '.manifest.json'
+
+
+def hash_string(text):
+    """
+    Content hash of a string as stored in the manifest.
+    """
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=8).hexdigest()
+
+
+def load_manifest(manifest_path):
+    """
+    Read a manifest written by save_manifest.
+    Returns the manifest dict, or None if it is missing, unreadable or from another version.
+    """
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def save_manifest(manifest_path, dat_path, hashes, dedupe):
+    """
+    Record the string hashes of dat_path together with its size and mtime,
+    so a later run can tell whether the .dat still matches the hashes.
+    """
+    stat = os.stat(dat_path)
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'dat_size': stat.st_size,
+        'dat_mtime_ns': stat.st_mtime_ns,
+        'dedupe': dedupe,
+        'hashes': hashes,
+    }
+    write_file_atomic(manifest_path, json.dumps(manifest, separators=(',', ':')).encode('utf-8'))
+
+
+def _manifest_matches(manifest, dat_path, dedupe):
+    """
+    Check that the manifest describes dat_path as it is on disk now.
+    """
+    if manifest is None or manifest.get('dedupe') != dedupe:
+        return False
+    try:
+        stat = os.stat(dat_path)
+    except OSError:
+        return False
+    return stat.st_size == manifest.get('dat_size') and stat.st_mtime_ns == manifest.get('dat_mtime_ns')
+
+
+def _full_build(output_path, strings, hashes, manifest_path, dedupe, stats):
+    """
+    Encode and write every string, then record a fresh manifest.
+    """
+    with stats.span('encode'):
+        encoded = [text.encode('utf-16le') for text in strings]
+    stats.count('strings_encoded', len(encoded))
+    data, saved_bytes = pack_dat_payloads(encoded, dedupe=dedupe, stats=stats)
+    with stats.span('write_dat'):
+        write_file_atomic(output_path, data)
+        save_manifest(manifest_path, output_path, hashes, dedupe)
+    stats.count('bytes_written', len(data))
+    return 'full', list(range(len(strings))), saved_bytes
+
+
+def update_dat_incremental(output_path, strings, manifest_path=None, dedupe=False, stats=NULL_STATS):
+    """
+    Bring output_path up to date with strings, reusing its previous contents.
+    Strings whose hash matches the manifest keep their encoded payload from the
+    previous .dat byte for byte; only changed strings are encoded.
+    If every changed string keeps its encoded size, the .dat is patched in place;
+    otherwise it is reassembled and written atomically.
+    Falls back to a full build if the manifest is missing or does not match the .dat.
+    Returns (status, changed string IDs, bytes saved by deduplication), where status
+    is one of 'unchanged', 'patched', 'rebuilt' or 'full'.
+    Stages are timed into stats when a collector is given.
+    """
+    manifest_path = manifest_path or default_manifest_path(output_path)
+    with stats.span('hash'):
+        hashes = [hash_string(text) for text in strings]
+        manifest = load_manifest(manifest_path)
+    if not _manifest_matches(manifest, output_path, dedupe):
+        return _full_build(output_path, strings, hashes, manifest_path, dedupe, stats)
+    old_hashes = manifest['hashes']
+    changed = [i for i, h in enumerate(hashes) if i >= len(old_hashes) or old_hashes[i] != h]
+    if not changed and len(hashes) == len(old_hashes):
+        return 'unchanged', [], 0
+    with stats.span('encode'):
+        encoded_changed = {i: strings[i].encode('utf-16le') for i in changed}
+    stats.count('strings_encoded', len(changed))
+    patches = None
+    with DatFile(output_path) as previous:
+        stale = len(previous) != len(old_hashes)
+        if not stale and not dedupe and len(hashes) == len(old_hashes):
+            patches = [(previous.positions[i], data) for i, data in encoded_changed.items()
+                       if len(data) == previous.lengths[i] * 2]
+            if len(patches) != len(changed):
+                patches = None
+        if not stale and patches is None:
+            payloads = [encoded_changed[i] if i in encoded_changed else previous.payload(i)
+                        for i in range(len(strings))]
+    if stale:
+        return _full_build(output_path, strings, hashes, manifest_path, dedupe, stats)
+    if patches is not None:
+        with stats.span('write_dat'):
+            with open(output_path, 'r+b') as f:
+                for pos, data in patches:
+                    f.seek(pos)
+                    f.write(data)
+            save_manifest(manifest_path, output_path, hashes, dedupe)
+        stats.count('bytes_written', sum(len(data) for _, data in patches))
+        return 'patched', changed, 0
+    data, saved_bytes = pack_dat_payloads(payloads, dedupe=dedupe, stats=stats)
+    with stats.span('write_dat'):
+        write_file_atomic(output_path, data)
+        save_manifest(manifest_path, output_path, hashes, dedupe)
+    stats.count('bytes_written', len(data))
+    return 'rebuilt', changed, saved_bytes
@@ -0,0 +1,60 @@
+"""
+Single-string lookup for LangTool X modules.
+"""
+
+import os
+import logging
+from modules.utils import read_bed_file_cached, read_bed_names_cached
+from modules.datfile import read_dat_string
+from modules.txtindex import read_txt_block
+from modules.results import LookupResult
+
+logger = logging.getLogger('langtool')
+
+
+def resolve_string_id(key, bed_path=None):
+    """
+    Turn a lookup key into a string ID: integers and digit strings are IDs,
+    anything else is a name resolved through the .bed file.
+    Raises KeyError for unknown names.
+    """
+    if isinstance(key, int):
+        return key
+    if key.isdigit():
+        return int(key)
+    if not bed_path or not os.path.exists(bed_path):
+        raise KeyError(f"Lookup by name requires a .bed file: {key}")
+    names = read_bed_names_cached(bed_path)
+    if key not in names:
+        raise KeyError(f"Unknown string name: {key}")
+    return names[key]
+
+
+def lookup_string(path, key, bed_path=None):
+    """
+    Read one string by ID or BED name without loading the whole file.
+    From a .dat only the string's table entry and payload are read; from a
+    .txt the block is located through the sidecar index (built if missing or
+    stale). Returns LookupResult; nothing is printed.
+    """
+    result = LookupResult(path, key)
+    with result.span('total'):
+        try:
+            with result.span('resolve'):
+                result.string_id = resolve_string_id(key, bed_path)
+                if bed_path and os.path.exists(bed_path):
+                    result.name = read_bed_file_cached(bed_path)[0].get(result.string_id)
+            if path.lower().endswith('.txt'):
+                with result.span('read_txt'):
+                    result.text = read_txt_block(path, result.string_id)
+                if result.text is None:
+                    raise ValueError(f"String ID {result.string_id} is marked {{INVALID}}")
+            else:
+                with result.span('read_dat'):
+                    result.text = read_dat_string(path, result.string_id)
+            result.ok = True
+        except KeyError as e:
+            result.fail(f"Error: {e.args[0]}")
+        except Exception as e:
+            result.fail(f"Error reading string: {e}")
+    return result
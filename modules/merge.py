@@ -0,0 +1,152 @@
+"""
+Multi-language merged extraction for LangTool X modules.
+"""
+
+import os
+import csv
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from modules.utils import (read_languages_from_ini_cached, read_bed_file_cached, read_bed_warnings_cached,
+                           WRITE_BUFFER_SIZE)
+from modules.datfile import DatFile
+from modules.txtblock import format_text_lines
+from modules.batch import find_dat_files
+from modules.results import MergeResult
+
+FORMATS = ('txt', 'csv', 'tsv')
+
+logger = logging.getLogger('langtool')
+
+
+def find_language_dats(pattern):
+    """
+    Expand a directory or glob pattern into .dat paths for merged extraction.
+    For a directory with a version.ini, the languages listed there are used
+    in ID order; otherwise every language*.dat found.
+    """
+    if os.path.isdir(pattern):
+        languages = read_languages_from_ini_cached(os.path.join(pattern, 'version.ini'))
+        if languages:
+            paths = [os.path.join(pattern, f'language{lang_id}.dat') for lang_id in sorted(languages)]
+            return [path for path in paths if os.path.isfile(path)]
+    return find_dat_files(pattern)
+
+
+def language_label(dat_path, languages):
+    """
+    Column label of a .dat: its version.ini language name, else its file name.
+    """
+    name = os.path.splitext(os.path.basename(dat_path))[0]
+    lang_num = name[8:]
+    if name.startswith('language') and lang_num.isdigit() and languages and int(lang_num) in languages:
+        return languages[int(lang_num)]
+    return name
+
+
+def _read_strings(dat_path):
+    with DatFile(dat_path) as dat:
+        return dat.decode_all(), dat.file_size
+
+
+def extract_merged(dat_paths, bed_path, output_path, output_format=None, workers=None):
+    """
+    Extract several .dat files (e.g. every language of a game) into one file
+    with a column per language. The .dat files are read concurrently and share
+    one BED map. output_format is 'txt', 'csv' or 'tsv'; by default it follows
+    the output file extension (anything but .csv/.tsv gives txt).
+    The merged .txt is a side-by-side view and cannot be converted back.
+    Returns MergeResult; nothing is printed.
+    """
+    result = MergeResult(dat_paths, bed_path, output_path)
+    if output_format is None:
+        extension = os.path.splitext(output_path)[1].lower().lstrip('.')
+        output_format = extension if extension in FORMATS else 'txt'
+    result.output_format = output_format
+    with result.span('total'):
+        try:
+            _merge(result, workers)
+        except Exception as e:
+            result.fail(f"Error processing file: {e}")
+    return result
+
+
+def _merge(result, workers):
+    """
+    Body of extract_merged; fills result and raises on I/O or format errors.
+    """
+    if result.output_format not in FORMATS:
+        raise ValueError(f"Unknown output format: {result.output_format}")
+    if not result.dat_paths:
+        raise ValueError("No .dat files to merge")
+    with result.span('read_ini'):
+        columns = []
+        for dat_path in result.dat_paths:
+            languages = read_languages_from_ini_cached(os.path.join(os.path.dirname(dat_path), 'version.ini'))
+            columns.append(language_label(dat_path, languages))
+    result.columns = columns
+    with result.span('read_bed'):
+        string_ids, _ = read_bed_file_cached(result.bed_path) if result.bed_path else ({}, 0)
+        if result.bed_path:
+            result.warnings.extend(read_bed_warnings_cached(result.bed_path))  # Already logged by read_bed_file
+    result.bed_ids = len(string_ids)
+    with result.span('read_dat'):
+        with ThreadPoolExecutor(max_workers=workers or min(8, len(result.dat_paths))) as pool:
+            tables = list(pool.map(_read_strings, result.dat_paths))
+    result.str_nums = [len(strings) for strings, _ in tables]
+    for strings, file_size in tables:
+        result.count('bytes_read', file_size)
+        result.count('strings_decoded', len(strings))
+    rows = max(result.str_nums)
+    for column, str_num in zip(columns, result.str_nums):
+        if str_num != rows:
+            result.warn(f"WARNING: {column} has {str_num} strings, {rows} expected; missing cells are left empty")
+    if string_ids and len(string_ids) != rows:
+        result.warn(f"WARNING: Number of strings in .dat ({rows}) and .bed ({len(string_ids)}) do not match!")
+    if rows == 0:
+        result.fail("ERROR: No strings found in .dat files.")
+        return
+    string_lists = [strings for strings, _ in tables]
+    with result.span('write'):
+        if result.output_format == 'txt':
+            with open(result.output_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as out:
+                out.writelines(_render_merged_blocks(string_lists, columns, string_ids, rows))
+        else:
+            dialect = 'excel' if result.output_format == 'csv' else 'excel-tab'
+            with open(result.output_path, 'w', encoding='utf-8-sig', newline='', buffering=WRITE_BUFFER_SIZE) as out:
+                writer = csv.writer(out, dialect=dialect)
+                writer.writerow(['ID', 'Name'] + columns)
+                writer.writerows(_merged_rows(string_lists, string_ids, rows))
+    result.count('bytes_written', os.path.getsize(result.output_path))
+    result.total_blocks = rows
+    for string_id in range(rows):
+        texts = [strings[string_id] for strings in string_lists if string_id < len(strings)]
+        if not any(texts):
+            result.empty_blocks += 1
+        elif any('\n' in text for text in texts):
+            result.multiline_blocks += 1
+    result.single_blocks = rows - result.multiline_blocks
+    logger.info(f"Merged extraction: languages={len(columns)}, total={rows}, multiline={result.multiline_blocks}, format={result.output_format}")
+    result.ok = True
+
+
+def _merged_rows(string_lists, string_ids, rows):
+    """
+    Yield [id, name, text per language] rows; missing strings are empty cells.
+    """
+    for string_id in range(rows):
+        name = string_ids.get(string_id, f"String_{string_id}")
+        yield [string_id, name] + [strings[string_id] if string_id < len(strings) else ''
+                                   for strings in string_lists]
+
+
+def _render_merged_blocks(string_lists, columns, string_ids, rows):
+    """
+    Yield one .txt-style block per string with a [LANGUAGE] line per column.
+    """
+    for row in _merged_rows(string_lists, string_ids, rows):
+        lines = [f"[String ID: {row[0]}] [{row[1]}]\n"]
+        for column, text in zip(columns, row[2:]):
+            body = format_text_lines(text) if text else '{EMPTY}'
+            lines.append(f"[{column}] {body}" if body.endswith('\n') else f"[{column}] {body}\n")
+        lines.append('\n')
+        yield ''.join(lines)
@@ -0,0 +1,80 @@
+"""
+Timing and counter instrumentation for LangTool X modules.
+"""
+
+import time
+
+
+class _Span:
+    """
+    Context manager adding its wall time to stats.timings[name] on exit.
+    """
+
+    __slots__ = ('stats', 'name', 'start')
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        timings = self.stats.timings
+        timings[self.name] = timings.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
+
+
+class Stats:
+    """
+    Collector for named timing spans (seconds, summed per name) and integer counters.
+    Spans may nest; an outer span includes the time of the spans inside it.
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self.counters = {}
+
+    def span(self, name):
+        """
+        Time a block: `with stats.span('parse_txt'): ...`
+        """
+        return _Span(self, name)
+
+    def count(self, name, value=1):
+        """
+        Add value to counter `name`.
+        """
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def as_dict(self):
+        return {'timings': dict(self.timings), 'counters': dict(self.counters)}
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+class NullStats:
+    """
+    Stand-in collector used when the caller does not ask for instrumentation.
+    Spans and counters are no-ops, so the cost is one method call per stage.
+    """
+
+    _span = _NullSpan()
+
+    def span(self, name):
+        return self._span
+
+    def count(self, name, value=1):
+        pass
+
+
+NULL_STATS = NullStats()
@@ -0,0 +1,264 @@
+"""
+Result objects returned by LangTool X operations.
+"""
+
+import logging
+from modules.profiling import Stats
+
+logger = logging.getLogger('langtool')
+
+
+class BaseResult(Stats):
+    """
+    Success flag and error message shared by all single-operation results,
+    with the per-stage timings and byte/string counters collected through the
+    Stats interface. Evaluates to True when the operation succeeded.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.ok = False
+        self.error = None
+
+    def __bool__(self):
+        return self.ok
+
+    def fail(self, msg):
+        """
+        Mark the operation as failed with msg and log it.
+        """
+        self.ok = False
+        self.error = msg
+        logger.error(msg)
+
+    def to_dict(self):
+        """
+        Return every field as JSON-serializable data.
+        """
+        return dict(vars(self))
+
+
+class OperationResult(BaseResult):
+    """
+    Common outcome of an extract/convert run: BaseResult plus warnings and
+    block counters.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.warnings = []
+        self.total_blocks = 0
+        self.empty_blocks = 0
+        self.invalid_blocks = 0
+        self.multiline_blocks = 0
+        self.single_blocks = 0
+
+    def warn(self, msg):
+        """
+        Record a warning and log it.
+        """
+        self.warnings.append(msg)
+        logger.warning(msg)
+
+
+class ExtractResult(OperationResult):
+    """
+    Outcome of extract_strings.
+    """
+
+    def __init__(self, dat_path, bed_path, output_path, original_dat_path=None):
+        super().__init__()
+        self.dat_path = dat_path
+        self.bed_path = bed_path
+        self.output_path = output_path
+        self.original_dat_path = original_dat_path
+        self.language = ''
+        self.original_language = ''
+        self.bed_ids = 0
+        self.expected_blocks = 0
+        self.str_num = 0
+        self.text_offset = 0
+        self.file_size = 0
+
+
+class ConvertResult(OperationResult):
+    """
+    Outcome of convert_to_dat. validation holds the DatValidationReport of the
+    written file (None if validation did not run).
+    """
+
+    def __init__(self, txt_path, input_dat_path, output_dat_path):
+        super().__init__()
+        self.txt_path = txt_path
+        self.input_dat_path = input_dat_path
+        self.output_dat_path = output_dat_path
+        self.language = ''
+        self.dedupe = False
+        self.saved_bytes = 0
+        self.incremental = False
+        self.update_status = None
+        self.changed_strings = 0
+        self.validation = None
+
+    def to_dict(self):
+        data = super().to_dict()
+        if self.validation is not None:
+            data['validation'] = {'ok': self.validation.ok, 'messages': list(self.validation.messages())}
+        return data
+
+
+class VerifyResult(OperationResult):
+    """
+    Outcome of verify_dat_file. validation holds the DatValidationReport
+    (None if the file could not be opened); checksum is the BLAKE2b digest of
+    the file and string_checksums those of each string payload, in ID order.
+    bed_ids is None when no .bed file was available for the count check.
+    """
+
+    def __init__(self, dat_path, bed_path):
+        super().__init__()
+        self.dat_path = dat_path
+        self.bed_path = bed_path
+        self.str_num = 0
+        self.bed_ids = None
+        self.file_size = 0
+        self.text_offset = 0
+        self.checksum = None
+        self.string_checksums = []
+        self.validation = None
+
+    def to_dict(self):
+        data = super().to_dict()
+        if self.validation is not None:
+            data['validation'] = {'ok': self.validation.ok, 'shared': self.validation.shared,
+                                  'messages': list(self.validation.messages())}
+        return data
+
+
+class MergeResult(OperationResult):
+    """
+    Outcome of extract_merged. columns holds the language label of each .dat
+    in dat_paths; total_blocks is the number of rows written.
+    """
+
+    def __init__(self, dat_paths, bed_path, output_path):
+        super().__init__()
+        self.dat_paths = list(dat_paths)
+        self.bed_path = bed_path
+        self.output_path = output_path
+        self.output_format = None
+        self.columns = []
+        self.str_nums = []
+        self.bed_ids = 0
+
+
+class BatchResult(Stats):
+    """
+    Outcome of run_batch and verify_dat_files: one (dat_path, result) pair per
+    job, the .dat files skipped for lack of a .txt, and the wall time of the
+    parallel run.
+    Evaluates to True when every matched file was processed successfully.
+    """
+
+    COUNTERS = ('total_blocks', 'empty_blocks', 'invalid_blocks', 'multiline_blocks', 'single_blocks')
+
+    def __init__(self, action, pattern):
+        super().__init__()
+        self.action = action
+        self.pattern = pattern
+        self.error = None
+        self.dat_paths = []
+        self.items = []
+        self.skipped = []
+
+    @property
+    def failed(self):
+        return [dat_path for dat_path, result in self.items if not result]
+
+    def to_dict(self):
+        """
+        Return the batch and every per-file result as JSON-serializable data.
+        """
+        return {'action': self.action, 'pattern': self.pattern, 'ok': self.ok, 'error': self.error,
+                **self.as_dict(), 'skipped': list(self.skipped),
+                'files': [result.to_dict() for _, result in self.items]}
+
+    @property
+    def ok(self):
+        return self.error is None and not self.failed and not self.skipped
+
+    def __bool__(self):
+        return self.ok
+
+    def totals(self):
+        """
+        Sum block counters and warnings over all processed files.
+        """
+        totals = dict.fromkeys(self.COUNTERS, 0)
+        totals['warnings'] = 0
+        for _, result in self.items:
+            for name in self.COUNTERS:
+                totals[name] += getattr(result, name)
+            totals['warnings'] += len(result.warnings)
+        return totals
+
+
+class LookupResult(BaseResult):
+    """
+    Outcome of lookup_string: the resolved string ID, its BED name (None if
+    unknown) and its text. Evaluates to True when the string was found.
+    """
+
+    def __init__(self, path, key):
+        super().__init__()
+        self.path = path
+        self.key = key
+        self.string_id = None
+        self.name = None
+        self.text = None
+
+
+class DiffResult(BaseResult):
+    """
+    Outcome of diff_dat_files or diff_txt_files. modified, added and removed are lists of
+    DiffEntry in ID order. Evaluates to True when both files could be compared.
+    """
+
+    def __init__(self, old_path, new_path):
+        super().__init__()
+        self.old_path = old_path
+        self.new_path = new_path
+        self.old_count = 0
+        self.new_count = 0
+        self.unchanged = 0
+        self.modified = []
+        self.added = []
+        self.removed = []
+
+    @property
+    def changed(self):
+        return bool(self.modified or self.added or self.removed)
+
+    def to_dict(self):
+        data = super().to_dict()
+        for key in ('modified', 'added', 'removed'):
+            data[key] = [entry.to_dict() for entry in data[key]]
+        return data
+
+
+class DiffEntry:
+    """
+    One changed string: its ID, BED name (None if unknown) and the old and new
+    text (None on the side where the string does not exist).
+    """
+
+    __slots__ = ('string_id', 'name', 'old_text', 'new_text')
+
+    def __init__(self, string_id, name, old_text, new_text):
+        self.string_id = string_id
+        self.name = name
+        self.old_text = old_text
+        self.new_text = new_text
+
+    def to_dict(self):
+        return {'id': self.string_id, 'name': self.name, 'old': self.old_text, 'new': self.new_text}
@@ -0,0 +1,294 @@
+"""
+Long-running JSON-RPC server for LangTool X modules.
+
+Editor integrations keep one process running and send requests over stdin/stdout
+or a Unix socket instead of starting the CLI for every save. Parsed BED, INI and
+DAT files stay in memory and are re-read only when their mtime or size changes.
+
+Protocol: JSON-RPC 2.0, one JSON object per line. Parameters are passed by name:
+
+    {"jsonrpc": "2.0", "id": 1, "method": "lookup", "params": {"dat": "language0.dat", "id": 42}}
+"""
+
+import os
+import sys
+import json
+import stat
+import time
+import socket
+import asyncio
+import logging
+import threading
+from modules.utils import ParseCache, parse_cache, read_bed_file_cached, read_bed_names_cached
+from modules.datfile import read_string_table
+from modules.extract import extract_strings
+from modules.convert import convert_to_dat
+from modules.diff import diff_tables
+
+logger = logging.getLogger('langtool')
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+MAX_REQUEST_SIZE = 64 << 20  # Longest request line read from stdin
+
+
+class RpcError(Exception):
+    """
+    Error reported to the client as a JSON-RPC error object.
+    """
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class LangToolServer:
+    """
+    Request dispatcher holding the warm caches.
+    BED and INI files go through the process-wide parse_cache; DAT files are
+    kept as compact StringTables (decoded per lookup) in a separate cache so
+    they are never written to a --cache file.
+    """
+
+    def __init__(self, max_dat_files=16):
+        self.dat_cache = ParseCache(max_entries=max_dat_files)
+        self.started = time.time()
+        self.requests = 0
+        self.methods = {
+            'ping': self.ping,
+            'extract': self.extract,
+            'convert': self.convert,
+            'lookup': self.lookup,
+            'diff': self.diff,
+            'stats': self.stats,
+            'shutdown': self.shutdown,
+        }
+        self._loop = None
+        self._stop = None
+
+    def ping(self):
+        return {'pid': os.getpid(), 'uptime': time.time() - self.started}
+
+    def extract(self, dat, bed, txt, original_dat=None, index=False):
+        return extract_strings(dat, bed, txt, original_dat_path=original_dat, index=index).to_dict()
+
+    def convert(self, txt, dat, out, bed, dedupe=False, incremental=False, manifest=None, index=False):
+        return convert_to_dat(txt, dat, out, bed, dedupe=dedupe, incremental=incremental,
+                              manifest_path=manifest, index=index).to_dict()
+
+    def diff(self, old, new, bed=None):
+        old_table = self.dat_cache.get('dat', old, read_string_table)
+        new_table = self.dat_cache.get('dat', new, read_string_table)
+        return diff_tables(old_table, new_table, old_path=old, new_path=new, bed_path=bed).to_dict()
+
+    def lookup(self, dat, id=None, name=None, bed=None):
+        """
+        Return one string by numeric id or by BED name.
+        """
+        if name is not None:
+            if bed is None:
+                raise RpcError(INVALID_PARAMS, "Lookup by name requires 'bed'")
+            names = read_bed_names_cached(bed)
+            if name not in names:
+                raise RpcError(INVALID_PARAMS, f"Unknown string name: {name}")
+            id = names[name]
+        if not isinstance(id, int) or isinstance(id, bool):
+            raise RpcError(INVALID_PARAMS, "Lookup requires an integer 'id' or a 'name'")
+        strings = self.dat_cache.get('dat', dat, read_string_table)
+        if not 0 <= id < len(strings):
+            raise RpcError(INVALID_PARAMS, f"String ID {id} out of range (0-{len(strings) - 1})")
+        if name is None and bed is not None:
+            name = read_bed_file_cached(bed)[0].get(id, f"String_{id}")
+        return {'id': id, 'name': name, 'text': strings[id]}
+
+    def stats(self):
+        return {'requests': self.requests, 'uptime': time.time() - self.started,
+                'parse_cache': parse_cache.stats(), 'dat_cache': self.dat_cache.stats()}
+
+    def shutdown(self):
+        if self._stop is not None:  # Called from a worker thread
+            self._loop.call_soon_threadsafe(self._stop.set)
+        return True
+
+    def handle(self, line):
+        """
+        Answer one request line. Returns the response object, or None for notifications.
+        Runs in a worker thread; the caches are thread-safe.
+        """
+        request_id = None
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                raise RpcError(PARSE_ERROR, f"Parse error: {e}")
+            if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+                raise RpcError(INVALID_REQUEST, "Invalid request")
+            request_id = request.get('id')
+            method = self.methods.get(request['method'])
+            if method is None:
+                raise RpcError(METHOD_NOT_FOUND, f"Method not found: {request['method']}")
+            params = request.get('params', {})
+            if not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, "Parameters must be passed by name")
+            self.requests += 1
+            try:
+                result = method(**params)
+            except TypeError as e:
+                raise RpcError(INVALID_PARAMS, f"Invalid params: {e}")
+            except RpcError:
+                raise
+            except Exception as e:
+                logger.error(f"Server error in {request['method']}: {e}")
+                raise RpcError(SERVER_ERROR, str(e))
+            if 'id' not in request:
+                return None
+            return {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+        except RpcError as e:
+            return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': e.code, 'message': e.message}}
+
+    async def _respond(self, line):
+        loop = asyncio.get_event_loop()
+        response = await loop.run_in_executor(None, self.handle, line)
+        return None if response is None else (json.dumps(response) + '\n').encode('utf-8')
+
+    async def serve_stdio(self):
+        """
+        Serve requests read from stdin, writing responses to stdout, until EOF or shutdown.
+        Requests are answered one at a time in the order received.
+        Returns True if a thread is still blocked reading stdin (see run_server).
+        """
+        loop = self._loop = asyncio.get_event_loop()
+        self._stop = asyncio.Event()
+        reader = await _open_stdin_pipe(loop)
+        reader_thread = None
+        if reader is None:
+            # Consoles and files cannot be watched by the event loop: read them in a
+            # daemon thread so a blocking readline does not keep the process alive
+            reader = asyncio.StreamReader(limit=MAX_REQUEST_SIZE)
+
+            def read_stdin():
+                for line in sys.stdin.buffer:
+                    loop.call_soon_threadsafe(reader.feed_data, line)
+                loop.call_soon_threadsafe(reader.feed_eof)
+
+            reader_thread = threading.Thread(target=read_stdin, daemon=True)
+            reader_thread.start()
+        out = sys.stdout.buffer
+        while not self._stop.is_set():
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            data = await self._respond(line)
+            if data is not None:
+                out.write(data)
+                out.flush()
+        return reader_thread is not None and reader_thread.is_alive()
+
+    async def serve_unix(self, socket_path):
+        """
+        Serve requests on a Unix socket until shutdown. Each connection sends
+        request lines and receives responses in the same order.
+        """
+        self._loop = asyncio.get_event_loop()
+        self._stop = asyncio.Event()
+
+        async def client(reader, writer):
+            try:
+                while not self._stop.is_set():
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    if not line.strip():
+                        continue
+                    data = await self._respond(line)
+                    if data is not None:
+                        writer.write(data)
+                        await writer.drain()
+            except ConnectionError:
+                pass
+            finally:
+                writer.close()
+
+        remove_stale_socket(socket_path)
+        server = await asyncio.start_unix_server(client, path=socket_path)
+        try:
+            await self._stop.wait()
+        finally:
+            server.close()
+            await server.wait_closed()
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+
+
+async def _open_stdin_pipe(loop):
+    """
+    Return a StreamReader on stdin if it is a pipe or socket the event loop
+    can watch, else None. Terminals are left alone: watching one would switch
+    it to non-blocking mode for the parent shell as well.
+    """
+    try:
+        mode = os.fstat(sys.stdin.fileno()).st_mode
+    except (OSError, ValueError, AttributeError):
+        return None
+    if not (stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode)):
+        return None
+    reader = asyncio.StreamReader(limit=MAX_REQUEST_SIZE)
+    try:
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin.buffer)
+    except (NotImplementedError, ValueError, OSError):  # e.g. pipes on the Windows event loop
+        return None
+    return reader
+
+
+def remove_stale_socket(socket_path):
+    """
+    Remove a socket left behind by a server that is no longer running.
+    Raises RuntimeError if socket_path is not a socket or a server still
+    accepts connections on it.
+    """
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise RuntimeError(f"{socket_path} exists and is not a socket")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        os.remove(socket_path)  # Nobody listening: left behind by a previous server
+        return
+    finally:
+        probe.close()
+    raise RuntimeError(f"Another server is already listening on {socket_path}")
+
+
+def run_server(socket_path=None):
+    """
+    Run the server on stdin/stdout, or on a Unix socket if socket_path is given.
+    Returns when the client sends 'shutdown' (or closes stdin).
+    Returns True if a thread is still blocked reading stdin: it holds the
+    stdin lock, which aborts a normal interpreter exit, so the caller must
+    end the process with os._exit once its own cleanup is done.
+    Raises RuntimeError if the socket cannot be used.
+    """
+    if socket_path and not hasattr(asyncio, 'start_unix_server'):
+        raise RuntimeError("Unix sockets are not supported on this platform; use stdin/stdout")
+    server = LangToolServer()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    logger.info(f"Server started: {socket_path or 'stdio'}")
+    try:
+        stdin_blocked = loop.run_until_complete(server.serve_unix(socket_path) if socket_path else server.serve_stdio())
+    finally:
+        loop.close()
+        logger.info(f"Server stopped after {server.requests} requests")
+    return bool(stdin_blocked)
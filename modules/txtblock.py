@@ -4,6 +4,41 @@ TXT block parsing for LangTool X modules.
 
 import re
 
+HEADER_PREFIX = '[String ID:'
+_HEADER_RE = re.compile(r'\[String ID: (\d+)\]')
+
+
+def format_text_lines(text):
+    """
+    Render string text for .txt output: each line break becomes {LF} plus a newline.
+    """
+    return text.replace('\n', '{LF}\n')
+
+
+def format_text_block(string_id, string_name, text, original_text=None):
+    """
+    Render one complete .txt block as a single string: header, optional
+    //original// reference, text (or {EMPTY}) and the trailing blank line.
+    """
+    if '\n' in text:
+        header = f"[String ID: {string_id}] [{string_name}] [Do not remove {{LF}} tags]\n"
+    else:
+        header = f"[String ID: {string_id}] [{string_name}]\n"
+    if original_text is None:
+        original = ''
+    elif original_text == '':
+        original = '//{EMPTY}//\n'
+    else:
+        original = f"//{format_text_lines(original_text)}//\n"
+    if not text:
+        body = '{EMPTY}\n'
+    elif text.endswith('\n'):
+        body = format_text_lines(text)
+    else:
+        body = format_text_lines(text) + '\n'
+    return f"{header}{original}{body}\n"
+
+
 def parse_text_block(lines):
     """
     Parse text block from .txt file and return (string_id, text content).
@@ -12,7 +47,7 @@ def parse_text_block(lines):
     if not lines:
         return None, None
     header = lines[0]
-    id_match = re.match(r'\[String ID: (\d+)\]', header)
+    id_match = _HEADER_RE.match(header)
     if not id_match:
         return None, None
     string_id = int(id_match.group(1))
@@ -43,4 +78,53 @@ def parse_text_block(lines):
             text.append((line[:-4], True))  # (text, needs_line_break)
         else:
             text.append((line, False))
-    return string_id, text 
\ No newline at end of file
+    return string_id, text 
+
+
+def iter_text_blocks(lines):
+    """
+    Stream text blocks from an iterable of .txt lines (e.g. an open file).
+    Yields (string_id, text) per block, where text is the joined string with
+    line breaks restored, or None for {INVALID} blocks. Blocks whose header
+    cannot be parsed are skipped. Only the current block is held in memory.
+    """
+    string_id = None
+    parts = []
+    finished = False  # Set by {EMPTY}/{INVALID}: ignore the rest of the block
+    in_original_block = False
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if line.startswith(HEADER_PREFIX):
+            if string_id is not None:
+                yield string_id, None if parts is None else ''.join(parts)
+            id_match = _HEADER_RE.match(line)
+            string_id = int(id_match.group(1)) if id_match else None
+            parts = []
+            finished = False
+            in_original_block = False
+            continue
+        if string_id is None or finished or not line:
+            continue
+        if line == '{EMPTY}':
+            parts = []
+            finished = True
+            continue
+        if line == '{INVALID}':
+            parts = None
+            finished = True
+            continue
+        # Skip original text blocks (//...//), single or multiline
+        if line.startswith('//'):
+            in_original_block = not line.endswith('//')
+            continue
+        if in_original_block:
+            if line.endswith('//'):
+                in_original_block = False
+            continue
+        if line.endswith('{LF}'):
+            parts.append(line[:-4])
+            parts.append('\n')
+        else:
+            parts.append(line)
+    if string_id is not None:
+        yield string_id, None if parts is None else ''.join(parts)
@@ -0,0 +1,257 @@
+"""
+Sidecar block index for .txt translation files.
+
+The index (<txt>.idx) stores, for every block in file order, its byte offset
+and length, string ID, a BLAKE2b hash of the raw block bytes and flags. It is
+tied to the .txt by size and mtime and rebuilt when either changes. After a
+convert it also records the .dat written from the .txt, so the next convert
+can take unchanged blocks from that .dat instead of parsing them again.
+"""
+
+import io
+import os
+import re
+import sys
+import struct
+import hashlib
+from array import array
+from itertools import accumulate
+from modules.utils import write_file_atomic
+from modules.txtblock import iter_text_blocks
+
+INDEX_MAGIC = b'LTXI'
+INDEX_VERSION = 2  # 1 could index files with bare \r line breaks wrongly
+HASH_SIZE = 8
+FLAG_INVALID = 1  # Block was {INVALID} when the .dat was built
+
+# magic, version, reserved, txt size, txt mtime_ns, dat size, dat mtime_ns, block count
+_HEADER = struct.Struct('<4sHHQqQqI')
+_HEADER_SEPARATOR = b'\n[String ID:'
+_HEADER_RE = re.compile(rb'\n\[String ID:(?: (\d+)\])?')  # Matches exactly where _HEADER_SEPARATOR splits
+
+
+def default_index_path(txt_path):
+    """
+    Index path used when none is given: next to the .txt.
+    """
+    return txt_path + '.idx'
+
+
+def _file_stamp(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class TxtIndex:
+    """
+    Block table of one .txt file. Blocks whose header has no valid ID are not
+    listed, matching iter_text_blocks, which skips them.
+    """
+
+    def __init__(self, txt_size=0, txt_mtime_ns=0):
+        self.txt_size = txt_size
+        self.txt_mtime_ns = txt_mtime_ns
+        self.dat_size = 0  # Stamp of the .dat last built from this .txt (0 = none)
+        self.dat_mtime_ns = 0
+        self.offsets = array('Q')
+        self.lengths = array('I')
+        self.ids = array('I')
+        self.flags = array('B')
+        self.hashes = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def matches(self, txt_path):
+        """
+        Check that the index describes txt_path as it is on disk now.
+        """
+        try:
+            return _file_stamp(txt_path) == (self.txt_size, self.txt_mtime_ns)
+        except OSError:
+            return False
+
+    def built_dat(self, dat_path):
+        """
+        Check that dat_path is still the .dat built from the indexed blocks.
+        """
+        try:
+            return self.dat_size != 0 and _file_stamp(dat_path) == (self.dat_size, self.dat_mtime_ns)
+        except OSError:
+            return False
+
+    def find(self, string_id):
+        """
+        Return the position of the first block with string_id, or -1.
+        """
+        try:
+            return self.ids.index(string_id)
+        except ValueError:
+            return -1
+
+    def to_bytes(self):
+        arrays = [array('Q', self.offsets), array('I', self.lengths), array('I', self.ids)]
+        if sys.byteorder == 'big':
+            for values in arrays:
+                values.byteswap()
+        header = _HEADER.pack(INDEX_MAGIC, INDEX_VERSION, 0, self.txt_size, self.txt_mtime_ns,
+                              self.dat_size, self.dat_mtime_ns, len(self))
+        return b''.join([header] + [values.tobytes() for values in arrays]
+                        + [self.flags.tobytes()] + self.hashes)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Parse an index written by to_bytes. Raises ValueError if it is malformed.
+        """
+        if len(data) < _HEADER.size:
+            raise ValueError("Index too small")
+        magic, version, _, txt_size, txt_mtime_ns, dat_size, dat_mtime_ns, count = _HEADER.unpack_from(data)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise ValueError("Not a LangTool X index or unsupported version")
+        if len(data) != _HEADER.size + count * (8 + 4 + 4 + 1 + HASH_SIZE):
+            raise ValueError("Index truncated")
+        index = cls(txt_size, txt_mtime_ns)
+        index.dat_size, index.dat_mtime_ns = dat_size, dat_mtime_ns
+        pos = _HEADER.size
+        for values, size in ((index.offsets, 8), (index.lengths, 4), (index.ids, 4)):
+            values.frombytes(data[pos:pos + count * size])
+            if sys.byteorder == 'big':
+                values.byteswap()
+            pos += count * size
+        index.flags.frombytes(data[pos:pos + count])
+        pos += count
+        index.hashes = [data[i:i + HASH_SIZE] for i in range(pos, pos + count * HASH_SIZE, HASH_SIZE)]
+        return index
+
+
+def scan_txt_blocks(data, txt_size=0, txt_mtime_ns=0):
+    """
+    Build a TxtIndex from the raw bytes of a .txt file.
+    A block runs from its header line to the newline before the next header
+    line (or to the end of the file). Headers are found with one bytes.split
+    and their IDs with one regex pass, so no line-by-line work is done.
+    """
+    index = TxtIndex(txt_size, txt_mtime_ns)
+    data_ids = _HEADER_RE.findall(data)
+    parts = data.split(_HEADER_SEPARATOR)
+    if data.startswith(_HEADER_SEPARATOR[1:]):
+        parts[0] = parts[0][len(_HEADER_SEPARATOR) - 1:]
+        data_ids.insert(0, _HEADER_RE.match(b'\n' + data.split(b'\n', 1)[0]).group(1))
+        start = 0
+    else:  # Text before the first header is not a block
+        start = len(parts.pop(0)) + 1
+    if not parts:
+        return index
+    lengths = [len(_HEADER_SEPARATOR) + len(part) for part in parts]  # Header prefix + the newline before the next one
+    lengths[-1] -= 1
+    offsets = list(accumulate([start] + lengths[:-1]))
+    if not all(data_ids):  # Headers without a valid ID are skipped, as by iter_text_blocks
+        keep = [i for i, string_id in enumerate(data_ids) if string_id]
+        parts, lengths, offsets, data_ids = ([values[i] for i in keep] for values in (parts, lengths, offsets, data_ids))
+    blake2b = hashlib.blake2b
+    index.offsets = array('Q', offsets)
+    index.lengths = array('I', lengths)
+    index.ids = array('I', map(int, data_ids))
+    index.flags = array('B', bytes(len(parts)))
+    index.hashes = [blake2b(part, digest_size=HASH_SIZE).digest() for part in parts]
+    return index
+
+
+def can_scan(data):
+    """
+    Byte-level scanning only splits lines on \\n; files that also use bare \\r
+    line breaks must go through the text-mode parser instead.
+    """
+    return data.count(b'\r') == data.count(b'\r\n')
+
+
+def build_txt_index(txt_path):
+    """
+    Read txt_path and return its TxtIndex, or None if it uses bare \r line
+    breaks and cannot be scanned byte-wise (see can_scan).
+    """
+    with open(txt_path, 'rb') as f:
+        stamp = _file_stamp(txt_path)
+        data = f.read()
+    return scan_txt_blocks(data, *stamp) if can_scan(data) else None
+
+
+def load_txt_index(index_path):
+    """
+    Read an index file. Returns TxtIndex, or None if it is missing or unreadable.
+    """
+    try:
+        with open(index_path, 'rb') as f:
+            return TxtIndex.from_bytes(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def save_txt_index(index_path, index):
+    write_file_atomic(index_path, index.to_bytes())
+
+
+def get_txt_index(txt_path, index_path=None):
+    """
+    Return an up-to-date index for txt_path, rebuilding and saving it if the
+    stored one is missing or stale. A failed save is not an error.
+    Returns None if the file cannot be indexed; use read_txt_blocks instead.
+    """
+    index_path = index_path or default_index_path(txt_path)
+    index = load_txt_index(index_path)
+    if index is not None and index.matches(txt_path):
+        return index
+    index = build_txt_index(txt_path)
+    if index is None:
+        return None
+    try:
+        save_txt_index(index_path, index)
+    except OSError:
+        pass
+    return index
+
+
+def parse_block(data):
+    """
+    Parse the raw bytes of one block as iter_text_blocks would.
+    Returns (string_id, text or None for {INVALID}).
+    """
+    for block in iter_text_blocks(io.StringIO(data.decode('utf-8'), newline=None)):
+        return block
+    return None, None
+
+
+def read_txt_blocks(txt_path):
+    """
+    Parse a whole .txt with iter_text_blocks, for files that cannot be indexed.
+    Returns {string_id: text or None for {INVALID}}; the first block of a
+    repeated ID counts, as in index lookups.
+    """
+    blocks = {}
+    with open(txt_path, 'r', encoding='utf-8') as f:
+        for string_id, text in iter_text_blocks(f):
+            blocks.setdefault(string_id, text)
+    return blocks
+
+
+def read_txt_block(txt_path, string_id, index=None):
+    """
+    Read one block by string ID, seeking straight to it through the index
+    (or parsing the whole file if it cannot be indexed).
+    Returns the text (None for {INVALID}). Raises KeyError if the ID is not in the file.
+    """
+    if index is None:
+        index = get_txt_index(txt_path)
+    if index is None:
+        blocks = read_txt_blocks(txt_path)
+        if string_id not in blocks:
+            raise KeyError(f"String ID {string_id} not found in {txt_path}")
+        return blocks[string_id]
+    position = index.find(string_id)
+    if position < 0:
+        raise KeyError(f"String ID {string_id} not found in {txt_path}")
+    with open(txt_path, 'rb') as f:
+        f.seek(index.offsets[position])
+        data = f.read(index.lengths[position])
+    return parse_block(data)[1]
@@ -0,0 +1,171 @@
+"""
+Bulk UTF-16LE codec for .dat string tables.
+
+A text section is decoded with one decode call and split using the offset
+table; strings are encoded with one encode call of all strings joined by the
+NUL separator, and offsets are derived from cumulative lengths. Characters
+outside the BMP are two UTF-16 code units but one str index; the surrogate
+pairs are located once and used to translate between the two.
+
+NumPy, when available (see USE_NUMPY), does the offset arithmetic and bounds
+checks and locates surrogate pairs. Without it the same is done in pure
+Python, except that sections with non-BMP characters are left to per-string
+decoding, which is faster than translating offsets in Python; a scan for
+high surrogates finds them before the section is decoded. Both give
+identical results.
+"""
+
+import re
+import sys
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+
+# NumPy takes longer to import than it saves on a single table, so by default
+# it is only used once something else has imported it. Long-running callers
+# (server, watch mode) set USE_NUMPY = True to import it on first use;
+# False disables it.
+USE_NUMPY = None
+_numpy_missing = False
+
+_ASTRAL_RE = re.compile('[\U00010000-\U0010FFFF]')
+
+
+def _numpy():
+    """
+    Return the numpy module if it may be used, else None.
+    """
+    global _numpy_missing
+    if USE_NUMPY is False:
+        return None
+    module = sys.modules.get('numpy')
+    if module is None and USE_NUMPY and not _numpy_missing:
+        try:
+            import numpy as module
+        except ImportError:
+            _numpy_missing = True
+    return module
+
+
+def decode_section(section, start, positions, lengths):
+    """
+    Decode every string of a text section at once.
+    section holds the file bytes from offset start to the end of the file;
+    positions (file offsets) and lengths (code units) come from the table.
+    Returns the list of strings, or None if an entry is misaligned, outside
+    the section or splits a surrogate pair; the caller must then decode
+    entry by entry.
+    """
+    if len(section) & 1:  # A trailing odd byte can belong to no entry
+        section = section[:-1]
+    numpy = _numpy()
+    if numpy is None and _has_high_surrogate(section):
+        return None  # Translating offsets in pure Python costs more than it saves
+    text = section.decode('utf-16le', 'replace')
+    pairs = ()
+    if len(text) * 2 != len(section):
+        if numpy is None:
+            return None
+        units = numpy.frombuffer(section, dtype='<u2')
+        pairs = numpy.flatnonzero(((units[:-1] & 0xFC00) == 0xD800) & ((units[1:] & 0xFC00) == 0xDC00))
+        if len(text) + len(pairs) != len(units):
+            return None
+    if len(pairs) or (numpy is not None and len(positions) > 1):
+        bounds = _char_bounds_numpy(numpy, start, len(section), positions, lengths, pairs)
+    else:
+        bounds = _char_bounds(start, len(section), positions, lengths)
+    if bounds is None:
+        return None
+    return [text[begin:end] for begin, end in zip(*bounds)]
+
+
+def _has_high_surrogate(section):
+    """
+    True if any code unit of an even-length UTF-16LE section is a high
+    surrogate (0xD800-0xDBFF). Scans the high bytes with memchr-speed
+    searches, much cheaper than decoding a section only to discard it.
+    """
+    high_bytes = section[1::2]
+    return any(byte in high_bytes for byte in (b'\xd8', b'\xd9', b'\xda', b'\xdb'))
+
+
+def _char_bounds(start, size, positions, lengths):
+    """
+    str (begin, end) index lists of every entry of a section without
+    surrogate pairs, or None if any is misaligned or outside the section.
+    """
+    if (any((pos - start) & 1 or pos < start for pos in positions)
+            or max(map(lambda pos, length: pos + length * 2, positions, lengths), default=0) > start + size):
+        return None
+    begins = [(pos - start) >> 1 for pos in positions]
+    return begins, list(map(int.__add__, begins, lengths))
+
+
+def _char_bounds_numpy(numpy, start, size, positions, lengths, pairs):
+    """
+    NumPy version of _char_bounds; pairs are the code unit offsets of the
+    surrogate pairs in the section, which shift later entries by one index
+    each. Entries starting or ending inside a pair give None.
+    """
+    relative = numpy.asarray(positions, dtype=numpy.int64) - start
+    counts = numpy.asarray(lengths, dtype=numpy.int64)
+    if (relative & 1).any() or (relative < 0).any() or (relative + counts * 2 > size).any():
+        return None
+    bounds = [relative >> 1]
+    bounds.append(bounds[0] + counts)
+    if len(pairs):
+        pairs = numpy.asarray(pairs, dtype=numpy.int64)
+        for i, units in enumerate(bounds):
+            k = numpy.searchsorted(pairs, units)
+            before = k > 0
+            if (pairs[k[before] - 1] + 1 == units[before]).any():  # Inside a surrogate pair
+                return None
+            bounds[i] = units - k
+    return bounds[0].tolist(), bounds[1].tolist()
+
+
+def encode_strings(strings):
+    """
+    Encode strings as a text section: each string followed by the 2-byte
+    null separator, all in one encode call.
+    Returns (section bytes, array('I') of lengths in UTF-16 code units).
+    Raises UnicodeEncodeError for strings that cannot be encoded, as
+    str.encode('utf-16le') does.
+    """
+    if not strings:
+        return b'', array('I')
+    joined = '\x00'.join(strings) + '\x00'
+    numpy = _numpy()
+    data = joined.encode('utf-16le')
+    lengths = array('I', map(len, strings))
+    if len(data) != len(joined) * 2:  # Non-BMP characters take two code units
+        if numpy is not None:
+            units = numpy.frombuffer(data, dtype='<u2')
+            pairs = numpy.flatnonzero((units & 0xFC00) == 0xD800)  # Strict encoding leaves no lone surrogates
+            counts = numpy.asarray(lengths, dtype=numpy.int64)
+            starts = numpy.cumsum(counts + 1)  # Character offset after each separator
+            owners = numpy.searchsorted(starts, pairs - numpy.arange(len(pairs)), side='right')
+            counts += numpy.bincount(owners, minlength=len(counts))
+            return data, array('I', counts.astype(numpy.uint32).tobytes())
+        starts = list(accumulate(length + 1 for length in lengths))
+        for match in _ASTRAL_RE.finditer(joined):
+            lengths[bisect_right(starts, match.start())] += 1
+    return data, lengths
+
+
+def offsets_from_lengths(lengths, first):
+    """
+    File offsets of consecutive strings, each followed by a separator,
+    starting at first. Returns array('I').
+    """
+    numpy = _numpy()
+    if numpy is not None and len(lengths) > 1:
+        sizes = numpy.asarray(lengths, dtype=numpy.int64) * 2 + 2  # +2 for separator
+        offsets = numpy.empty(len(lengths), dtype=numpy.int64)
+        offsets[0] = first
+        numpy.cumsum(sizes[:-1], out=offsets[1:])
+        offsets[1:] += first
+        if offsets[-1] > 0xFFFFFFFF:
+            raise OverflowError("unsigned int is greater than maximum")
+        return array('I', offsets.astype(numpy.uint32).tobytes())
+    return array('I', accumulate([first] + [length * 2 + 2 for length in lengths]))[:-1]
@@ -3,6 +3,16 @@ Utility functions for LangTool X modules.
 """
 
 import os
+import json
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+
+WRITE_BUFFER_SIZE = 1 << 20  # 1 MiB buffer for .txt/.csv output
+
+logger = logging.getLogger('langtool')
+logger.addHandler(logging.NullHandler())  # Library use stays silent unless the caller configures logging
 
 
 def generate_missing_ids(str_num):
@@ -16,9 +26,10 @@ def generate_missing_ids(str_num):
     return string_ids, str_num
 
 
-def read_bed_file(bed_path):
+def read_bed_file(bed_path, warnings=None):
     """
     Reads .bed file and returns dictionary string_id -> string_name and total valid lines count.
+    Problems are logged and, if a warnings list is given, appended to it as console messages.
     """
     string_ids = {}
     total_lines = 0
@@ -34,9 +45,13 @@ def read_bed_file(bed_path):
                         string_id = int(id_str.strip())
                         string_ids[string_id] = name
                     except ValueError:
-                        print(f"Warning: Invalid string ID in line: {line}")
+                        logger.warning(f"Invalid string ID in line: {line}")
+                        if warnings is not None:
+                            warnings.append(f"Warning: Invalid string ID in line: {line}")
     except Exception as e:
-        print(f"Error reading .bed file: {e}")
+        logger.error(f"Error reading .bed file: {e}")
+        if warnings is not None:
+            warnings.append(f"Error reading .bed file: {e}")
         return {}, 0
     return string_ids, total_lines
 
@@ -76,7 +91,7 @@ def get_language_name(dat_path, languages=None):
     """
     if languages is None:
         ini_path = os.path.join(os.path.dirname(dat_path), 'version.ini')
-        languages = read_languages_from_ini(ini_path)
+        languages = read_languages_from_ini_cached(ini_path)
         if languages is None:
             return ""
     filename = os.path.basename(dat_path)
@@ -86,4 +101,204 @@ def get_language_name(dat_path, languages=None):
             lang_id = int(lang_num)
             if languages and lang_id in languages:
                 return f" [{languages[lang_id]} ({lang_id})]"
-    return "" 
\ No newline at end of file
+    return "" 
+
+def write_file_atomic(path, data):
+    """
+    Write bytes to path via a temporary file in the same directory and an atomic rename.
+    The temporary file is removed if anything fails.
+    """
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        with open(tmp_path, 'xb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class ParseCache:
+    """
+    In-process LRU cache for parsed BED/INI files.
+    Entries are keyed by (kind, path) and only reused while the file's mtime
+    and size are unchanged. The cache can be saved to and loaded from disk so
+    separate runs share parse results.
+    """
+
+    FILE_VERSION = 3  # 1 was a pickle, 2 had no BED warnings
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # (kind, abspath) -> ((mtime_ns, size), value)
+        self._lock = threading.Lock()
+
+    def get(self, kind, path, parser):
+        """
+        Return parser(path), reusing the cached result if the file is unchanged.
+        Missing files are passed straight to the parser and never cached.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return parser(path)
+        key = (kind, os.path.abspath(path))
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        value = parser(path)
+        with self._lock:
+            self._entries[key] = (stamp, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def stats(self):
+        """
+        Return hit/miss/eviction counters and the current number of entries.
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'evictions': self.evictions, 'entries': len(self._entries)}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def save(self, cache_path):
+        """
+        Write the cached BED/INI entries to cache_path as JSON (atomically).
+        Entries of other kinds are kept in memory only.
+        """
+        with self._lock:
+            entries = [{'kind': kind, 'path': path, 'mtime_ns': stamp[0], 'size': stamp[1],
+                        'value': _CACHE_CODECS[kind][0](value)}
+                       for (kind, path), (stamp, value) in self._entries.items() if kind in _CACHE_CODECS]
+        payload = {'version': self.FILE_VERSION, 'entries': entries}
+        write_file_atomic(cache_path, json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+
+    def load(self, cache_path):
+        """
+        Merge entries saved by save() into the cache. Stale entries are harmless:
+        they are re-validated against the file on every lookup.
+        Returns True if the file was loaded, False if it is missing, of another
+        version or malformed (nothing is merged then).
+        """
+        try:
+            with open(cache_path, 'rb') as f:
+                payload = json.loads(f.read().decode('utf-8'))
+        except (OSError, ValueError):
+            return False
+        if not isinstance(payload, dict) or payload.get('version') != self.FILE_VERSION:
+            return False
+        try:
+            loaded = [_decode_cache_entry(entry) for entry in payload['entries']]
+        except (KeyError, TypeError, ValueError):
+            return False
+        with self._lock:
+            for key, entry in loaded:
+                self._entries.setdefault(key, entry)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+
+def _int_key_map(value):
+    """
+    Decode a JSON object {"<int>": str} back into {int: str}.
+    """
+    if not isinstance(value, dict) or not all(isinstance(v, str) for v in value.values()):
+        raise TypeError("expected an object of strings")
+    return {int(k): v for k, v in value.items()}
+
+
+def _decode_bed(value):
+    string_ids, total_lines, warnings = value
+    if type(total_lines) is not int:
+        raise TypeError("expected an integer line count")
+    if not isinstance(warnings, list) or not all(isinstance(msg, str) for msg in warnings):
+        raise TypeError("expected a list of warnings")
+    return _int_key_map(string_ids), total_lines, warnings
+
+
+def _decode_bed_names(value):
+    if not isinstance(value, dict) or not all(type(v) is int for v in value.values()):
+        raise TypeError("expected an object of integers")
+    return value
+
+
+# kind -> (encode to JSON-compatible value, decode and validate); see the *_cached readers below
+_CACHE_CODECS = {
+    'bed': (lambda value: [{str(k): v for k, v in value[0].items()}, value[1], value[2]], _decode_bed),
+    'ini': (lambda value: None if value is None else {str(k): v for k, v in value.items()},
+            lambda value: None if value is None else _int_key_map(value)),
+    'bed_names': (lambda value: value, _decode_bed_names),
+}
+
+
+def _decode_cache_entry(entry):
+    """
+    Turn one saved entry into ((kind, path), ((mtime_ns, size), value)).
+    Raises KeyError, TypeError or ValueError if it is malformed.
+    """
+    kind, path, mtime_ns, size = entry['kind'], entry['path'], entry['mtime_ns'], entry['size']
+    if not isinstance(path, str) or type(mtime_ns) is not int or type(size) is not int:
+        raise TypeError("malformed cache entry")
+    return (kind, path), ((mtime_ns, size), _CACHE_CODECS[kind][1](entry['value']))
+
+
+parse_cache = ParseCache()
+
+
+def read_bed_file_cached(bed_path):
+    """
+    read_bed_file through the process-wide parse cache.
+    The returned dict is shared between callers and must not be modified.
+    """
+    return parse_cache.get('bed', bed_path, _read_bed_with_warnings)[:2]
+
+
+def read_bed_warnings_cached(bed_path):
+    """
+    Console messages for problems read_bed_file_cached met in bed_path
+    (already logged); repeated on every call while the file is unchanged.
+    """
+    return parse_cache.get('bed', bed_path, _read_bed_with_warnings)[2]
+
+
+def _read_bed_with_warnings(bed_path):
+    warnings = []
+    string_ids, total_lines = read_bed_file(bed_path, warnings)
+    return string_ids, total_lines, warnings
+
+
+def read_languages_from_ini_cached(ini_path='version.ini'):
+    """
+    read_languages_from_ini through the process-wide parse cache.
+    """
+    return parse_cache.get('ini', ini_path, read_languages_from_ini)
+
+
+def _read_bed_names(bed_path):
+    string_ids, _ = read_bed_file_cached(bed_path)
+    return {name: string_id for string_id, name in string_ids.items()}
+
+
+def read_bed_names_cached(bed_path):
+    """
+    Reverse BED map {string_name: string_id} through the process-wide parse cache.
+    """
+    return parse_cache.get('bed_names', bed_path, _read_bed_names)
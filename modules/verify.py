@@ -0,0 +1,115 @@
+"""
+Release verification for LangTool X modules.
+
+Checks every .dat file of a build in parallel worker processes. Each file is
+memory-mapped once and gets the structure check of check_dat_structure,
+BLAKE2b checksums of the whole file and of every string payload, and a check
+of its string count against the .bed file.
+"""
+
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from modules.utils import read_bed_file_cached
+from modules.datfile import DatFile, check_dat_structure
+from modules.batch import find_dat_files
+from modules.results import VerifyResult, BatchResult
+
+FILE_DIGEST_SIZE = 16   # Bytes of the per-file BLAKE2b digest
+STRING_DIGEST_SIZE = 8  # Bytes of each per-string digest; keeps reports small
+
+logger = logging.getLogger('langtool')
+
+
+def verify_dat_file(dat_path, bed_path=None, bed_ids=None, checksums=True):
+    """
+    Verify one .dat file: structure, checksums and string count.
+    bed_ids (the number of string IDs in the .bed) can be passed in to skip
+    re-parsing the .bed; without bed_path or bed_ids the count is not checked.
+    With checksums=False no digests are computed.
+    Returns VerifyResult; nothing is printed.
+    """
+    result = VerifyResult(dat_path, bed_path)
+    with result.span('total'):
+        try:
+            _verify(result, bed_ids, checksums)
+        except Exception as e:
+            result.fail(f"Error verifying file: {e}")
+    return result
+
+
+def _verify(result, bed_ids, checksums):
+    """
+    Body of verify_dat_file; fills result and raises on I/O or format errors.
+    """
+    if bed_ids is None and result.bed_path:
+        with result.span('read_bed'):
+            bed_ids = len(read_bed_file_cached(result.bed_path)[0])
+    with result.span('open_dat'):
+        dat = DatFile(result.dat_path)
+    with dat:
+        result.str_num = result.total_blocks = dat.str_num
+        result.file_size = dat.file_size
+        result.text_offset = dat.text_offset
+        result.count('bytes_read', dat.file_size)
+        with result.span('validate'):
+            report = result.validation = check_dat_structure(dat)
+        if checksums:
+            with result.span('checksum'):
+                result.checksum = dat.file_digest(FILE_DIGEST_SIZE)
+                result.string_checksums = dat.string_digests(STRING_DIGEST_SIZE)
+            result.count('strings_hashed', dat.str_num)
+        result.empty_blocks = dat.lengths.count(0)
+    for msg in report.gap_messages():  # Unused bytes are tolerated
+        result.warn(msg)
+    problems = []
+    if not report.ok:
+        problems.append(f"invalid structure ({len(report.out_of_bounds)} out of bounds, {len(report.overlaps)} "
+                        f"overlapping, {len(report.missing_separators)} without separator)")
+    result.bed_ids = bed_ids
+    if bed_ids is None:
+        result.warn("WARNING: No .bed file, string count not checked")
+    elif bed_ids != result.str_num:
+        problems.append(f"{result.str_num} strings in .dat but {bed_ids} in .bed")
+    if problems:
+        result.fail(f"ERROR: {'; '.join(problems)}")
+        return
+    result.ok = True
+
+
+def _verify_job(job):
+    """
+    Verify one file in a worker process. Returns (dat_path, VerifyResult).
+    """
+    dat_path, bed_path, bed_ids, checksums = job
+    return dat_path, verify_dat_file(dat_path, bed_path, bed_ids, checksums)
+
+
+def verify_dat_files(pattern, bed_path=None, workers=None, checksums=True):
+    """
+    Verify every .dat matched by pattern (a directory or glob) in parallel.
+    Without bed_path, languages.bed next to each .dat is used if present.
+    BED files are parsed once per directory; workers get their ID counts.
+    Returns BatchResult (action 'verify') holding the VerifyResults in input order.
+    """
+    batch = BatchResult('verify', pattern)
+    dat_paths = batch.dat_paths = find_dat_files(pattern)
+    if not dat_paths:
+        batch.error = f"Error: No .dat files found for {pattern}"
+        return batch
+    with batch.span('total'):
+        beds = {}
+        jobs = []
+        for dat_path in dat_paths:
+            dat_bed_path = bed_path or os.path.join(os.path.dirname(dat_path), 'languages.bed')
+            if not bed_path and not os.path.exists(dat_bed_path):
+                dat_bed_path = None
+            if dat_bed_path and dat_bed_path not in beds:
+                beds[dat_bed_path] = len(read_bed_file_cached(dat_bed_path)[0])
+            jobs.append((dat_path, dat_bed_path, beds.get(dat_bed_path), checksums))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            batch.items = list(pool.map(_verify_job, jobs))
+    for _, result in batch.items:
+        batch.count('bytes_read', result.counters.get('bytes_read', 0))
+    logger.info(f"Batch verify: matched={len(dat_paths)}, failed={len(batch.failed)}")
+    return batch
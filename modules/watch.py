@@ -0,0 +1,101 @@
+"""
+Watch mode for LangTool X modules.
+
+Polls the inputs of one or more convert jobs (.txt, .bed, template .dat and
+version.ini) and reconverts the outputs whose inputs changed. Polling is used
+because the standard library has no portable file change notification; a
+stat() per input every interval is cheap next to a rebuild. Parsed BED and INI
+data stay in parse_cache between rebuilds and are re-read only when changed.
+"""
+
+import os
+import logging
+import threading
+from modules.convert import convert_to_dat
+from modules.results import BatchResult
+
+POLL_INTERVAL = 0.5  # Seconds between checks
+DEBOUNCE = 0.3       # Seconds the inputs must stay unchanged before a rebuild
+
+logger = logging.getLogger('langtool')
+
+
+def _stamp(path):
+    try:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None  # Missing (e.g. mid-save by an editor that replaces the file)
+
+
+def _stamps(paths):
+    return {path: _stamp(path) for path in paths}
+
+
+def job_inputs(job):
+    """
+    Files a convert job (as built by plan_batch) reads.
+    """
+    _, dat_path, bed_path, txt_path = job[:4]
+    return {dat_path, bed_path, txt_path, os.path.join(os.path.dirname(dat_path), 'version.ini')}
+
+
+def _run_cycle(jobs, label):
+    """
+    Convert each job; returns BatchResult timed as 'total'.
+    """
+    batch = BatchResult('convert', label)
+    batch.dat_paths = [job[1] for job in jobs]
+    with batch.span('total'):
+        for _, dat_path, bed_path, txt_path, out_path, _, _, dedupe, incremental, index in jobs:
+            batch.items.append((dat_path, convert_to_dat(txt_path, dat_path, out_path, bed_path, dedupe=dedupe,
+                                                         incremental=incremental, index=index)))
+    return batch
+
+
+def watch_convert(jobs, interval=POLL_INTERVAL, debounce=DEBOUNCE, on_cycle=None, stop=None, max_cycles=None):
+    """
+    Convert every job once, then rebuild the jobs whose inputs change until
+    stop (a threading.Event) is set or max_cycles rebuilds have run.
+    A change is acted on only once the inputs have been quiet for `debounce`
+    seconds, so an editor writing a file in several steps triggers one rebuild.
+    on_cycle(changed_paths, batch) is called after each build with the changed
+    inputs (empty for the initial build) and a BatchResult whose
+    timings['total'] is the rebuild latency.
+    Returns the number of rebuilds after the initial build.
+    """
+    stop = stop or threading.Event()
+    jobs = [job[:5] + (None, None) + job[7:] for job in jobs]  # Let the caches re-read changed BED/INI files
+    inputs = [job_inputs(job) for job in jobs]
+    outputs = {job[4] for job in jobs}
+    paths = sorted(set().union(*inputs)) if inputs else []
+    stamps = _stamps(paths)
+    batch = _run_cycle(jobs, 'initial build')
+    if on_cycle:
+        on_cycle([], batch)
+    stamps.update(_stamps(outputs & set(paths)))  # Our own writes are not edits
+    cycles = 0
+    while max_cycles is None or cycles < max_cycles:
+        if stop.wait(interval):
+            break
+        current = _stamps(paths)
+        if current == stamps:
+            continue
+        while not stop.wait(debounce):  # Wait for the writes to settle
+            settled = _stamps(paths)
+            if settled == current:
+                break
+            current = settled
+        if stop.is_set():
+            break
+        changed = [path for path in paths if current[path] != stamps[path]]
+        stamps = current
+        affected = [job for job, job_paths in zip(jobs, inputs) if job_paths.intersection(changed)]
+        batch = _run_cycle(affected, ', '.join(changed))
+        cycles += 1
+        logger.info(f"Watch rebuild {cycles}: changed={len(changed)}, rebuilt={len(affected)}, "
+                    f"failed={len(batch.failed)}, seconds={batch.timings['total']:.3f}")
+        if on_cycle:
+            on_cycle(changed, batch)
+        stamps.update(_stamps(outputs & set(paths)))
+    return cycles
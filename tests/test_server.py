@@ -0,0 +1,39 @@
+import os
+import sys
+import json
+import subprocess
+import pytest
+
+CLI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'langtool_x.py')
+SHUTDOWN = b'{"jsonrpc": "2.0", "id": 1, "method": "shutdown"}\n'
+
+
+def test_stdio_shutdown_with_stdin_open_exits_cleanly(tmp_path):
+    server = subprocess.Popen([sys.executable, CLI, '--serve'], stdin=subprocess.PIPE,
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=tmp_path)
+    server.stdin.write(SHUTDOWN)
+    server.stdin.flush()  # stdin stays open, as with an editor plugin
+    try:
+        assert server.wait(timeout=20) == 0
+        assert json.loads(server.stdout.read())['result'] is True
+        assert b'Fatal Python error' not in server.stderr.read()
+    finally:
+        server.stdin.close()
+        server.stdout.close()
+        server.stderr.close()
+
+
+@pytest.mark.skipif(not hasattr(os, 'openpty'), reason="needs a pseudo-terminal")
+def test_stdio_shutdown_from_terminal_exits_cleanly(tmp_path):
+    master, slave = os.openpty()
+    try:
+        server = subprocess.Popen([sys.executable, CLI, '--serve'], stdin=slave,
+                                  stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=tmp_path)
+        os.write(master, SHUTDOWN)
+        out, err = server.communicate(timeout=20)
+        assert server.returncode == 0
+        assert json.loads(out)['result'] is True
+        assert b'Fatal Python error' not in err
+    finally:
+        os.close(master)
+        os.close(slave)
@@ -0,0 +1,29 @@
+from modules.diff import diff_txt_files
+from modules.lookup import lookup_string
+from modules.txtindex import get_txt_index
+
+OLD = "[String ID: 0] [MENU_OK]\rOK\r\r[String ID: 1] [MENU_BACK]\rBack\r"
+NEW = "[String ID: 0] [MENU_OK]\rOK\r\r[String ID: 1] [MENU_BACK]\rGo back\r"
+
+
+def write(path, text):
+    path.write_bytes(text.encode('utf-8'))
+    return str(path)
+
+
+def test_bare_cr_txt_is_not_indexed(tmp_path):
+    assert get_txt_index(write(tmp_path / 'mac.txt', OLD)) is None
+    assert not (tmp_path / 'mac.txt.idx').exists()
+
+
+def test_lookup_in_bare_cr_txt(tmp_path):
+    result = lookup_string(write(tmp_path / 'mac.txt', OLD), '1')
+    assert result.ok, result.error
+    assert result.text == 'Back'
+
+
+def test_diff_of_bare_cr_txt(tmp_path):
+    result = diff_txt_files(write(tmp_path / 'old.txt', OLD), write(tmp_path / 'new.txt', NEW))
+    assert result.ok, result.error
+    assert (result.old_count, result.new_count, result.unchanged) == (2, 2, 1)
+    assert [(entry.string_id, entry.old_text, entry.new_text) for entry in result.modified] == [(1, 'Back', 'Go back')]